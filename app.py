@@ -0,0 +1,14 @@
+"""
+Single-process entry point for every tenant:
+
+    streamlit run app.py        →  /?tenant=vault_dashboard_usd
+
+Wallet, price and sheet caches are shared by all tenants in this process.
+"""
+import streamlit as st
+
+from engine import render
+from tenants import TENANTS
+
+name = st.query_params.get("tenant", "dashboard")
+render(name if name in TENANTS else "dashboard", pick_tenant=True)
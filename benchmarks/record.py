@@ -0,0 +1,77 @@
+"""
+Record a benchmark fixture for ``benchmarks/run.py`` from the live APIs.
+
+Captures, for one tenant, the raw Debank payloads of its wallets, the Dune
+price (and rewards) rows and the token_category / off-chain worksheets –
+exactly what the dashboard pipeline consumes – into one JSON file.
+
+    python -m benchmarks.record -t vault_dashboard            # → benchmarks/fixtures/vault_dashboard.json
+    python -m benchmarks.record -t dashboard --limit 25 -o /tmp/dao.json
+
+Secrets come from ``.streamlit/secrets.toml``, as for the collector.
+Recorded fixtures contain real wallet data and are git-ignored.
+"""
+import argparse
+import datetime
+import json
+import os
+
+import streamlit as st
+
+import debank
+import dune
+import sheets
+from portfolio import parse_wallets
+from tenants import ALL_CHAIN_IDS, TENANTS
+
+from benchmarks.run import FIXTURES
+
+
+def record(name: str, limit: int | None = None) -> dict:
+    cfg = TENANTS[name]
+    sh  = sheets.spreadsheet(json.loads(st.secrets["gcp_service_account"]), st.secrets["sheet_id"])
+    values, errors = sheets.batch_get(sh, [sheets.a1(cfg["addresses"], "A:A"),
+                                           sheets.a1("token_category", "A:B"),
+                                           sheets.a1(cfg["offchain"])])
+    if errors[0]:
+        raise RuntimeError(f"unable to read {cfg['addresses']}: {errors[0]}")
+    wallets, _ = parse_wallets([r[0] if r else "" for r in values[0]])
+    wallets    = wallets[:limit] if limit else wallets
+
+    headers = {"AccessKey": st.secrets["ACCESS_KEY"]}
+    tokens, protocols = debank.fetch_wallets(
+        wallets,
+        lambda w: debank.all_token_list(w, ALL_CHAIN_IDS, headers),
+        lambda w: debank.all_complex_protocol_list(w, ALL_CHAIN_IDS, headers),
+    )
+    api_key = st.secrets["DUNE_API_KEY"]
+    rewards = (dune.query_rows(st.secrets[cfg["rewards"]["query_secret"]], api_key, timeout=20)
+               if cfg["rewards"] else [])
+    return {
+        "tenant":      name,
+        "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "debank":      {w: {"all_token_list": t, "all_complex_protocol_list": p}
+                        for w, t, p in zip(wallets, tokens, protocols)},
+        "dune_prices":  dune.query_rows(st.secrets["DUNE_QUERY_ID"], api_key),
+        "dune_rewards": rewards,
+        "sheets":      {"token_category": values[1], "offchain": values[2]},
+    }
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("-t", "--tenant", required=True, choices=sorted(TENANTS))
+    ap.add_argument("--limit", type=int, help="record at most this many wallets")
+    ap.add_argument("-o", "--out", help="output file (default: benchmarks/fixtures/<tenant>.json)")
+    args = ap.parse_args(argv)
+
+    fx  = record(args.tenant, args.limit)
+    out = args.out or os.path.join(FIXTURES, f"{args.tenant}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(fx, f)
+    print(f"{out}: {len(fx['debank'])} wallets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Offline benchmark of the dashboard data pipeline.
+
+Replays a recorded fixture (see ``benchmarks/record.py``) through the same
+helpers ``engine.render`` calls – fetch → flatten → filter → aggregate →
+format – without touching Debank, Dune or Google Sheets, and reports wall
+time and peak memory per stage for each wallet count.  Debank's per-chain
+endpoints are answered from the recorded ``all_*`` payloads, split by
+chain; the recorded Dune rows go through the same CSV parsing as live
+results.  Larger counts reuse the recorded wallets round-robin under fresh
+addresses.
+
+    python -m benchmarks.run                                  # sample fixture, 10 / 100 / 1000 wallets
+    python -m benchmarks.run -f benchmarks/fixtures/dashboard.json -n 50 -n 5000
+    python -m benchmarks.run --synthetic --seed 7             # generated wallets, see synthetic.py
+
+Timings come from a plain pass; memory from a second pass under
+``tracemalloc`` (which slows Python code down too much to time with).
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+from unittest import mock
+
+import pandas as pd
+
+import debank
+import dune
+import engine
+from portfolio import category_totals, filter_frames, offchain_frame
+from sheets import records
+from tenants import chain_names
+
+from benchmarks import synthetic
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+STAGES   = ["fetch", "flatten", "filter", "aggregate", "format"]
+PAGE     = 50                               # wallet-table rows formatted, as on screen
+
+
+def load_fixture(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def scaled_wallets(fx: dict, n: int) -> dict[str, str]:
+    """``n`` distinct addresses → the recorded wallet whose payloads they replay."""
+    recorded = list(fx["debank"])
+    if n <= len(recorded):
+        return {w: w for w in recorded[:n]}
+    return {f"0x{i:040x}": recorded[i % len(recorded)] for i in range(n)}
+
+
+class _Page:
+    """A one-page Dune CSV response."""
+    status_code, headers = 200, {}
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _replay(fx: dict, wallets: dict[str, str]) -> list:
+    """
+    Stand-ins for the network calls: Debank's answered from the fixture's
+    all_* payloads, Dune's (query ids "prices" / "rewards") served as the
+    CSV pages ``dune.query_frame`` parses.
+    """
+    debank_ = fx["debank"]
+    csv     = {q: pd.DataFrame(fx.get(f"dune_{q}", [])).to_csv(index=False)
+               for q in ("prices", "rewards")}
+
+    def dune_get(url, params=None, headers=None, timeout=None):
+        return _Page(csv[url.split("/query/")[1].split("/")[0]])
+
+    def get_json(endpoint, wallet, params, headers):
+        raw   = debank_[wallets[wallet]]
+        chain = params["chain_id"]
+        if endpoint == "token_list":
+            return [t for t in raw["all_token_list"] if t.get("chain") == chain]
+        return [p for p in raw["all_complex_protocol_list"] if p.get("chain") == chain]
+
+    def active_chains(addrs, headers, max_in_flight=debank.MAX_IN_FLIGHT):
+        out = {}
+        for w in addrs:
+            raw = debank_[wallets[w]]
+            out[w] = {x.get("chain") for x in raw["all_token_list"] + raw["all_complex_protocol_list"]}
+        return out
+
+    return [mock.patch.multiple(debank, _get_json=get_json, active_chains=active_chains),
+            mock.patch.object(engine, "_headers", lambda: {}),
+            mock.patch.object(dune.requests, "get", dune_get)]
+
+
+def pipeline(fx: dict, wallets: dict[str, str], stage) -> None:
+    """One render's worth of data work, through the helpers ``engine.render`` calls."""
+    chain_map = chain_names(fx["tenant"])
+    addrs     = list(wallets)
+    debank.RESPONSES.clear()                # every pass starts cold
+
+    with stage("fetch"):
+        pairs, tok_lists, prot_lists = engine.fetch_debank(addrs, list(chain_map), debank.MAX_IN_FLIGHT)
+
+    with stage("flatten"):
+        df_wallets, df_protocols = engine.debank_frames(pairs, tok_lists, prot_lists)
+        prices = dune.fetch_prices("prices", "")
+        engine.tidy_rewards(dune.query_frame("rewards", ""))
+
+    with stage("filter"):
+        df_offchain = offchain_frame(records(fx["sheets"].get("offchain", [])), prices)
+        df_wallets, df_protocols = filter_frames(df_wallets, df_protocols,
+                                                 list(chain_map.values()), df_offchain)
+
+    with stage("aggregate"):
+        cats = engine.load_token_categories({"token_category": (fx["sheets"].get("token_category", []), None)})
+        category_totals(df_wallets, df_protocols, cats)
+        engine.chain_totals(df_wallets, df_protocols)
+        engine.protocol_totals(df_wallets, df_protocols)
+
+    with stage("format"):
+        page = engine.wallet_page(engine.sort_wallets(df_wallets, "USD Value", True), 0, PAGE)
+        engine.md_table(page, engine.TABLE_COLS, max_rows=None)
+        for _, _, parts in engine.protocol_sections(df_protocols):
+            for _, part in parts:
+                engine.md_table(part, engine.TABLE_COLS)
+
+
+def measure(fx: dict, n: int) -> dict[str, tuple[float, int]]:
+    """{stage: (seconds, peak bytes)} for ``n`` wallets."""
+    wallets = scaled_wallets(fx, n)
+    seconds, peaks = {}, {}
+
+    @contextlib.contextmanager
+    def timed(name):
+        t0 = time.perf_counter()
+        yield
+        seconds[name] = time.perf_counter() - t0
+
+    @contextlib.contextmanager
+    def traced(name):
+        tracemalloc.reset_peak()
+        yield
+        peaks[name] = tracemalloc.get_traced_memory()[1]
+
+    with contextlib.ExitStack() as stubs:
+        for stub in _replay(fx, wallets):
+            stubs.enter_context(stub)
+        pipeline(fx, wallets, timed)
+        tracemalloc.start()
+        try:
+            pipeline(fx, wallets, traced)
+        finally:
+            tracemalloc.stop()
+    return {s: (seconds[s], peaks[s]) for s in STAGES}
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("-f", "--fixture", default=os.path.join(FIXTURES, "sample.json"),
+                    help="recorded fixture (default: the bundled sample)")
+    ap.add_argument("-n", "--wallets", type=int, action="append",
+                    help="wallet count to run (repeatable, default: 10, 100, 1000)")
+    ap.add_argument("--synthetic", action="store_true",
+                    help="generate n distinct wallets instead of replaying a fixture")
+    ap.add_argument("--seed", type=int, default=0, help="seed for --synthetic")
+    args = ap.parse_args(argv)
+
+    if args.synthetic:
+        print(f"synthetic wallets, seed {args.seed}")
+    else:
+        fx = load_fixture(args.fixture)
+        print(f"fixture {args.fixture}: tenant {fx['tenant']}, {len(fx['debank'])} recorded wallet(s)")
+    for n in args.wallets or [10, 100, 1000]:
+        if args.synthetic:
+            fx = synthetic.fixture(n, args.seed)
+        res = measure(fx, n)
+        print(f"\n{n:,} wallets")
+        print(f"  {'stage':<10} {'seconds':>9} {'peak MiB':>9}")
+        for s, (sec, peak) in res.items():
+            print(f"  {s:<10} {sec:9.4f} {peak / 2**20:9.1f}")
+        print(f"  {'total':<10} {sum(sec for sec, _ in res.values()):9.4f}")
+
+
+if __name__ == "__main__":
+    main()
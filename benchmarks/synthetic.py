@@ -0,0 +1,191 @@
+"""
+Seeded synthetic Debank payloads for scale testing.
+
+``fixture()`` builds a benchmark fixture (same layout as
+``benchmarks/record.py`` writes) whose ``all_token_list`` /
+``all_complex_protocol_list`` payloads have the exact shape the
+dashboard's Debank fetchers consume: majors plus a
+long tail of dust and unpriced tokens spread over ``CHAIN_IDS``, lending
+positions with borrows, LP pools with rewards, staking and farming.
+
+Wallet ``i`` depends only on ``(seed, i)``, so the first 100 wallets of a
+1,000-wallet run are the same 100 wallets a 100-wallet run sees.
+
+    python -m benchmarks.synthetic -n 1000 --seed 7 -o /tmp/synthetic.json
+    python -m benchmarks.synthetic -n 200 --pools 25 --chains eth,arb -o /tmp/lp_heavy.json
+    python -m benchmarks.run --synthetic --seed 7
+"""
+import argparse
+import json
+import random
+
+from tenants import CHAIN_IDS
+
+MAJORS = {"ETH": 2400.0, "WETH": 2400.0, "weETH": 2520.0, "wstETH": 2850.0, "ezETH": 2450.0,
+          "USDC": 1.0, "USDT": 1.0, "DAI": 1.0, "USDe": 1.0, "WBTC": 61000.0, "cbBTC": 61000.0,
+          "ARB": 0.55, "OP": 1.6, "AERO": 0.9, "UNI": 7.1, "CRV": 0.31, "PENDLE": 4.4}
+
+# protocol → (chain it lives on, classifications it offers)
+PROTOCOLS = {
+    "Aave V3":    ("eth",  ["Lending"]),
+    "Morpho":     ("eth",  ["Lending"]),
+    "Compound":   ("base", ["Lending"]),
+    "Uniswap V3": ("arb",  ["Liquidity Pool"]),
+    "Aerodrome":  ("base", ["Liquidity Pool", "Farming"]),
+    "Curve":      ("eth",  ["Liquidity Pool", "Farming"]),
+    "Pendle V2":  ("eth",  ["Liquidity Pool", "Staked"]),
+    "Lido":       ("eth",  ["Staked"]),
+    "EigenLayer": ("eth",  ["Staked", "Rewards"]),
+}
+
+
+def _token(rng: random.Random, chain: str, symbol: str, price: float, amount: float) -> dict:
+    return {
+        "id":               f"0x{rng.getrandbits(160):040x}",
+        "chain":            chain,
+        "name":             symbol,
+        "symbol":           symbol,
+        "display_symbol":   None,
+        "optimized_symbol": symbol,
+        "decimals":         18,
+        "is_core":          price > 0,
+        "price":            price,
+        "amount":           amount,
+    }
+
+
+def _major(rng: random.Random, chain: str, usd: float) -> dict:
+    sym = rng.choice(list(MAJORS))
+    return _token(rng, chain, sym, MAJORS[sym], usd / MAJORS[sym])
+
+
+def _dust_symbol(rng: random.Random) -> str:
+    return "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(3, 6)))
+
+
+def wallet_tokens(rng: random.Random, chains: list[str], n: int) -> list[dict]:
+    """all_token_list payload: ~25% majors, the rest dust, some of it unpriced."""
+    out = []
+    for _ in range(n):
+        chain = rng.choice(chains)
+        roll  = rng.random()
+        if roll < 0.25:
+            out.append(_major(rng, chain, rng.lognormvariate(9, 2)))
+        elif roll < 0.85:
+            out.append(_token(rng, chain, _dust_symbol(rng), rng.uniform(1e-6, 0.05),
+                              rng.uniform(1, 5e4)))
+        else:
+            out.append(_token(rng, chain, _dust_symbol(rng), 0, rng.uniform(1, 1e9)))
+    return out
+
+
+def _item(rng: random.Random, chain: str, cls: str, borrow_share: float) -> dict:
+    usd    = rng.lognormvariate(10, 1.5)
+    detail = {"supply_token_list": [], "reward_token_list": []}
+    if cls == "Lending":
+        detail["supply_token_list"] = [_major(rng, chain, usd)]
+        if rng.random() < borrow_share:
+            detail["borrow_token_list"] = [_major(rng, chain, usd * rng.uniform(0.1, 0.7))]
+    elif cls == "Liquidity Pool":
+        a, b = rng.sample(list(MAJORS), 2)
+        detail["supply_token_list"] = [_token(rng, chain, a, MAJORS[a], usd / 2 / MAJORS[a]),
+                                       _token(rng, chain, b, MAJORS[b], usd / 2 / MAJORS[b])]
+        detail["reward_token_list"] = [_token(rng, chain, a, MAJORS[a], usd * 0.002 / MAJORS[a])]
+        detail["description"]       = f"#{rng.randint(10_000, 999_999)}"      # NFT position id
+    else:
+        detail["supply_token_list"] = [_major(rng, chain, usd)]
+        if rng.random() < 0.5:
+            detail["reward_token_list"] = [_major(rng, chain, usd * 0.01)]
+    return {"name": cls, "detail": detail, "pool": {"id": f"0x{rng.getrandbits(160):040x}"}}
+
+
+LP_PROTOCOLS = [name for name, (_, classes) in PROTOCOLS.items() if "Liquidity Pool" in classes]
+
+
+def _protocol(rng: random.Random, chains: list[str], name: str) -> dict:
+    home = PROTOCOLS[name][0]
+    return {
+        "id":    name.lower().replace(" ", "_"),
+        "chain": home if home in chains else rng.choice(chains),
+        "name":  name,
+        "portfolio_item_list": [],
+    }
+
+
+def wallet_protocols(rng: random.Random, chains: list[str], n: int,
+                     positions: int, borrow_share: float, pools: int) -> list[dict]:
+    """
+    all_complex_protocol_list payload: ``n`` protocols with up to
+    ``positions`` non-LP items each, plus exactly ``pools`` LP positions
+    spread over the protocols that offer them.
+    """
+    out = {}
+    for name in rng.sample(list(PROTOCOLS), min(n, len(PROTOCOLS))):
+        classes = [c for c in PROTOCOLS[name][1] if c != "Liquidity Pool"]
+        if not classes:                     # LP-only protocols only get the pools below
+            continue
+        p = out[name] = _protocol(rng, chains, name)
+        p["portfolio_item_list"] = [_item(rng, p["chain"], rng.choice(classes), borrow_share)
+                                    for _ in range(rng.randint(1, positions))]
+    for _ in range(pools):
+        name = rng.choice(LP_PROTOCOLS)
+        p = out.setdefault(name, _protocol(rng, chains, name))
+        p["portfolio_item_list"].append(_item(rng, p["chain"], "Liquidity Pool", borrow_share))
+    return list(out.values())
+
+
+def fixture(wallets: int, seed: int = 0, chains: list[str] | None = None, tokens: int = 40,
+            protocols: int = 4, positions: int = 3, borrow_share: float = 0.5,
+            pools: int = 2, tenant: str = "dashboard") -> dict:
+    """A benchmark fixture with ``wallets`` synthetic wallets, ``pools`` LP positions each."""
+    chains = chains or CHAIN_IDS
+    debank = {}
+    for i in range(wallets):
+        rng = random.Random(f"{seed}:{i}")
+        debank[f"0x{rng.getrandbits(160):040x}"] = {
+            "all_token_list":            wallet_tokens(rng, chains, rng.randint(tokens // 2, tokens * 3 // 2)),
+            "all_complex_protocol_list": wallet_protocols(rng, chains, rng.randint(0, protocols),
+                                                          positions, borrow_share, pools),
+        }
+    return {
+        "tenant":       tenant,
+        "recorded_at":  f"synthetic seed={seed}",
+        "debank":       debank,
+        "dune_prices":  [{"token_symbol": s, "usd_price": p} for s, p in MAJORS.items()],
+        "dune_rewards": [],
+        "sheets": {
+            "token_category": [["btc", "BTC"], ["eth", "ETH"], ["usd", "Stables"], ["dai", "Stables"]],
+            "offchain": [["wallet_address", "blockchain", "token_symbol", "token_balance", "protocol"],
+                         ["Custody", "Off-chain", "USDC", "250000", "Copper"],
+                         ["Custody", "Off-chain", "WBTC", "3", "Copper"]],
+        },
+    }
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("-n", "--wallets", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--tokens", type=int, default=40, help="mean tokens per wallet")
+    ap.add_argument("--protocols", type=int, default=4, help="max protocols per wallet")
+    ap.add_argument("--positions", type=int, default=3, help="max non-LP positions per protocol")
+    ap.add_argument("--pools", type=int, default=2, help="LP positions per wallet")
+    ap.add_argument("--chains", type=lambda v: v.split(","), default=None, metavar="IDS",
+                    help="comma-separated Debank chain ids (default: every tracked chain)")
+    ap.add_argument("--borrow-share", type=float, default=0.5,
+                    help="share of lending positions that also borrow")
+    ap.add_argument("-o", "--out", required=True)
+    args = ap.parse_args(argv)
+    if args.chains and not set(args.chains) <= set(CHAIN_IDS):
+        ap.error(f"unknown chain id(s): {', '.join(sorted(set(args.chains) - set(CHAIN_IDS)))}")
+
+    fx = fixture(args.wallets, args.seed, chains=args.chains, tokens=args.tokens,
+                 protocols=args.protocols, positions=args.positions,
+                 borrow_share=args.borrow_share, pools=args.pools)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(fx, f)
+    print(f"{args.out}: {args.wallets} synthetic wallets (seed {args.seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Headless collector – runs the dashboards' Debank / Dune / Google-Sheets
+fan-out outside of Streamlit and writes one ready-to-render snapshot per
+tenant (see ``portfolio.write_portfolio_snapshot``).  While snapshots are
+fresh the dashboards only read them, so page latency no longer depends on
+how many wallets are tracked.  A wallet listed by several tenants is
+fetched once per pass.  The collector also appends each tenant's hourly
+history / wallet-balance rows to the sheets, so they are written whether
+or not anyone opens the page that hour.
+
+    python collector.py                        # every tenant, once
+    python collector.py --every 600            # loop forever, one pass per 10 min
+    python collector.py -t dashboard -t vault_dashboard_usd
+
+Secrets come from the same ``.streamlit/secrets.toml`` the dashboards use.
+Snapshots and the local store default to paths next to the code, so the
+collector and the app share them from any working directory; if you set
+``TREASURY_SNAPSHOT_DIR`` / ``TREASURY_MIRROR_DB``, set them for both.
+"""
+import argparse
+import datetime
+import json
+import logging
+import time
+
+import streamlit as st
+from requests import RequestException
+
+import debank
+import dune
+import sheets
+from portfolio import (SNAPSHOT_DIR, filter_frames, offchain_frame, parse_wallets, protocol_frame,
+                       read_portfolio_snapshot, token_categories, token_rows, wallet_frame,
+                       write_history_snapshot, write_portfolio_snapshot)
+from tenants import ALL_CHAIN_IDS, CHAIN_NAMES, TENANTS, chain_names
+
+log = logging.getLogger("collector")
+
+
+def _fetch(fn, wallet, chain_ids, headers, failed: set):
+    """
+    Run one Debank call; a failed wallet is logged, added to ``failed``
+    (so the page can say so) and counts as empty.
+    """
+    if not chain_ids:                       # an empty chain_ids would mean "every chain"
+        return []
+    try:
+        return fn(wallet, chain_ids, headers)
+    except (debank.DebankError, RequestException) as e:   # incl. timeout / connection error
+        log.warning("Debank %s: %s", wallet, e)
+        failed.add(wallet)
+        return []
+
+
+def _prices(names: list[str], root: str) -> tuple[dict, datetime.datetime | None]:
+    """
+    ``(prices, fetched_at)`` from Dune; when Dune fails, the last good prices
+    kept in the tenants' previous snapshots instead (so a Dune outage doesn't
+    drop every off-chain row), and ``({}, None)`` only if there are none.
+    """
+    try:
+        return (dune.fetch_prices(st.secrets["DUNE_QUERY_ID"], st.secrets["DUNE_API_KEY"]),
+                datetime.datetime.now(datetime.timezone.utc))
+    except Exception as e:
+        prev = [s for s in (read_portfolio_snapshot(n, root=root) for n in names)
+                if s is not None and s.get("prices")]
+        if not prev:
+            log.warning("Dune price fetch failed (%s) – off-chain balances skipped", e)
+            return {}, None
+        last = max(prev, key=lambda s: s["prices_at"])
+        log.warning("Dune price fetch failed (%s) – using prices from %s", e,
+                    last["prices_at"].isoformat(timespec="seconds"))
+        return last["prices"], last["prices_at"]
+
+
+def run_once(names: list[str], root: str) -> None:
+    sh      = sheets.spreadsheet(json.loads(st.secrets["gcp_service_account"]),
+                                 st.secrets["sheet_id"])
+    headers = {"AccessKey": st.secrets["ACCESS_KEY"]}
+    prices, prices_at = _prices(names, root)
+
+    # 1) addresses + off-chain sheets of every tenant, and the token categories,
+    #    in one values:batchGet
+    ranges = [sheets.a1(TENANTS[n][k], "A:A" if k == "addresses" else None)
+              for n in names for k in ("addresses", "offchain")]
+    values, errors = sheets.batch_get(sh, ranges + [sheets.a1("token_category", "A:B")])
+    config = {n: (values[2*i:2*i+2], errors[2*i:2*i+2]) for i, n in enumerate(names)}
+    if errors[-1]:
+        log.warning("unable to read token_category (%s) – categories fall back to Others", errors[-1])
+    cats = token_categories(values[-1]) if not errors[-1] else {}
+
+    wallets = {}
+    for name, ((addr_rows, _), (addr_err, _)) in config.items():
+        if addr_err:
+            log.warning("%s: unable to read wallets (%s) – keeping previous snapshot", name, addr_err)
+            continue
+        wallets[name], bad = parse_wallets([r[0] if r else "" for r in addr_rows])
+        if bad:
+            log.warning("%s: ignored %d malformed address(es)", name, len(bad))
+
+    # 2) one Debank pass over the union of wallets and chains
+    #    – each wallet only asks for the chains it has been active on
+    unique    = list(dict.fromkeys(w for ws in wallets.values() for w in ws))
+    in_flight = int(st.secrets.get("DEBANK_MAX_IN_FLIGHT", debank.MAX_IN_FLIGHT))
+    active    = debank.active_chains(unique, headers, in_flight)
+    chains    = {w: [c for c in ALL_CHAIN_IDS if active[w] is None or c in active[w]] for w in unique}
+    failed    = set()
+    tok_payloads, prot_payloads = debank.fetch_wallets(
+        unique,
+        lambda w: _fetch(debank.all_token_list, w, chains[w], headers, failed),
+        lambda w: _fetch(debank.all_complex_protocol_list, w, chains[w], headers, failed),
+        max_in_flight=in_flight,
+    )
+    tokens    = {w: token_rows(w, toks, CHAIN_NAMES) for w, toks in zip(unique, tok_payloads)}
+    protocols = dict(zip(unique, prot_payloads))
+    log.info("fetched %d unique wallets for %d tenant(s)", len(unique), len(wallets))
+
+    # 3) one snapshot per tenant
+    for name, ws in wallets.items():
+        try:
+            df_wallets   = wallet_frame(tokens[w] for w in ws)
+            df_protocols = protocol_frame(ws, [protocols[w] for w in ws], CHAIN_NAMES)
+            (_, off_rows), (_, off_err) = config[name]
+            if off_err:
+                raise RuntimeError(off_err)
+            df_offchain  = offchain_frame(sheets.records(off_rows), prices)
+            path = write_portfolio_snapshot(name, df_wallets, df_protocols, df_offchain, root=root,
+                                            failed=[w for w in ws if w in failed],
+                                            prices=prices, prices_at=prices_at)
+        except Exception:
+            # keep the previous snapshot; dashboards fall back to live once it ages out
+            log.exception("%s: collection failed", name)
+            continue
+        log.info("%s: %d wallets, %d token rows, %d protocol rows → %s",
+                 name, len(ws), len(df_wallets), len(df_protocols), path)
+
+        # 4) the hourly history / wallet-balance rows, as the page would show them
+        try:
+            shown_w, shown_p = filter_frames(df_wallets, df_protocols,
+                                             list(chain_names(name).values()), df_offchain)
+            write_history_snapshot(sh, TENANTS[name], shown_w, shown_p, cats)
+        except Exception:
+            log.exception("%s: hourly history snapshot failed", name)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("-t", "--tenant", action="append", choices=sorted(TENANTS),
+                    help="tenant to collect (repeatable, default: all)")
+    ap.add_argument("--every", type=int, default=0, metavar="SECONDS",
+                    help="repeat forever with this interval (default: run once)")
+    ap.add_argument("--out", default=SNAPSHOT_DIR, help="snapshot directory")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    names = args.tenant or list(TENANTS)
+
+    while True:
+        started = time.monotonic()
+        log.info("collecting %s at %s", ", ".join(names),
+                 datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"))
+        if not args.every:
+            run_once(names, args.out)
+            return
+        try:
+            run_once(names, args.out)
+        except Exception:
+            log.exception("collection pass failed – retrying next interval")
+        time.sleep(max(0.0, args.every - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    main()
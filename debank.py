@@ -0,0 +1,324 @@
+"""
+Debank Pro API plumbing shared by the dashboards.
+
+Anything that has to outlive a single Streamlit rerun (thread pools, rate
+limits, in-flight bookkeeping …) lives here: the dashboard scripts are
+re-executed top-to-bottom on every rerun, imported modules are not.
+"""
+import email.utils
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+import store
+from swr import SWRCache
+
+log = logging.getLogger("debank")
+
+MAX_IN_FLIGHT = 8          # default cap on simultaneous Debank requests
+
+SWR_TTL       = 600        # seconds a cached response counts as fresh
+SWR_MAX_STALE = 3600       # a response older than this is never served
+SWR_ERROR_TTL = 600        # seconds a failed fetch is remembered before it is retried
+
+ACTIVE_CHAINS_TTL   = 86400  # seconds between used_chain_list refreshes of one wallet
+ACTIVE_CHAINS_RETRY = 600    # seconds before a failed refresh is tried again
+
+# requests / second and burst size per endpoint (last path segment of the URL).
+# The endpoint budgets add up to more than the key allows, so every request
+# also draws from KEY_LIMIT – Debank Pro allows ~100 req/s per key.
+KEY_LIMIT   = (100, 100)
+RATE_LIMITS = {
+    "all_token_list":            (20, 20),
+    "all_complex_protocol_list": (20, 20),
+    "token_list":                (20, 20),     # per-chain variants of the two above
+    "complex_protocol_list":     (20, 20),
+    "*":                         (40, 40),     # any other endpoint
+}
+
+
+# ───────────── process-wide rate limiter ─────────────
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at ``rate`` tokens/s, banks at most
+    ``burst``.  ``hold()`` empties the bucket and blocks every caller until
+    the given delay has passed (used for ``Retry-After``).
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate  = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens     = self.burst
+        self._stamp      = time.monotonic()
+        self._hold_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._hold_until:
+                    wait = self._hold_until - now
+                else:
+                    self._tokens = min(self.burst,
+                                       self._tokens + (now - self._stamp) * self.rate)
+                    self._stamp = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def hold(self, seconds: float) -> None:
+        with self._lock:
+            self._hold_until = max(self._hold_until, time.monotonic() + seconds)
+            self._stamp      = self._hold_until
+            self._tokens     = 1.0          # one request may go as soon as the hold ends
+
+
+_BUCKETS = {ep: TokenBucket(*cfg) for ep, cfg in RATE_LIMITS.items()}
+_KEY     = TokenBucket(*KEY_LIMIT)      # shared by every endpoint
+
+
+def bucket_for(url: str) -> TokenBucket:
+    return _BUCKETS.get(url.rstrip("/").rsplit("/", 1)[-1], _BUCKETS["*"])
+
+
+def _retry_after(r: requests.Response) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header (delta or HTTP date)."""
+    val = r.headers.get("Retry-After")
+    if not val:
+        return None
+    try:
+        return max(0.0, float(val))
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(val)
+            return max(0.0, when.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+# Simple retry helper – waits for a rate-limit token, retries on HTTP 429 / 5xx
+def safe_get(url: str, params: dict, headers: dict, retries: int = 3):
+    bucket = bucket_for(url)
+    for attempt in range(retries):
+        bucket.acquire()
+        _KEY.acquire()
+        r = requests.get(url, params=params, headers=headers, timeout=15)
+        if r.status_code < 429 or attempt == retries - 1:
+            # success (2xx) or non-retryable / out-of-retries
+            return r
+        # server told us how long to back off → the key is throttled, so pause
+        # every caller on every endpoint, not just this one
+        delay = _retry_after(r)
+        if delay is not None:
+            bucket.hold(delay)
+            _KEY.hold(delay)
+        else:
+            time.sleep(0.25 * (2 ** attempt))      # 0.25s, 0.5s, 1s, …
+    return r   # last response (let caller decide what to do)
+
+
+# ───────────── concurrent wallet fetch ─────────────
+def fetch_wallets(wallets, *fns, max_in_flight: int = MAX_IN_FLIGHT) -> list[list]:
+    """
+    Run every ``fn(wallet)`` for every wallet on a bounded thread pool.
+
+    Returns one list per ``fn``, each in the same order as ``wallets``
+    (any hashable work items will do, e.g. ``(wallet, chain)`` pairs):
+
+        tokens, protocols = fetch_wallets(pairs, debank_tokens, debank_protocols)
+
+    The fns are expected to be cached fetchers (``engine.debank_tokens`` /
+    ``debank_protocols`` go through ``RESPONSES``), so warm entries come
+    straight back from the cache and only cold wallets actually hit the
+    network.  Worker threads inherit the caller's script
+    context – ``st.warning`` inside a fetcher still shows up on the page.
+    """
+    wallets = list(wallets)
+    if not wallets or not fns:
+        return [[] for _ in fns]
+
+    ctx = get_script_run_ctx()
+
+    def _attach_ctx():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+
+    workers = max(1, min(max_in_flight, len(wallets) * len(fns)))
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="debank",
+                            initializer=_attach_ctx) as pool:
+        futures = [[pool.submit(fn, w) for w in wallets] for fn in fns]
+        return [[f.result() for f in per_fn] for per_fn in futures]
+
+
+# ───────────── request coalescing ─────────────
+class SingleFlight:
+    """
+    Calls of ``do(key, fn)`` that overlap in time share one execution of
+    ``fn``: the first caller runs it, later callers with the same key block
+    until it finishes and get the same result (or exception).  Nothing is
+    kept once the call completes – caching is the callers' business.
+    """
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._calls = {}                # key → Future of the in-flight call
+
+    def do(self, key, fn):
+        with self._lock:
+            fut    = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+# ───────────── response cache ─────────────
+RESPONSES = SWRCache(SWR_TTL, SWR_MAX_STALE, name="debank-swr", error_ttl=SWR_ERROR_TTL)   # (endpoint, wallet[, chain]) → flattened response
+
+
+# ───────────── endpoints ─────────────
+API = "https://pro-openapi.debank.com/v1/user"
+
+
+class DebankError(RuntimeError):
+    """Non-200 answer from Debank; message is ready to show to a human."""
+
+
+_FLIGHTS = SingleFlight()       # (endpoint, wallet, params) → in-flight request
+
+
+def _get_json(endpoint: str, wallet: str, params: dict, headers: dict):
+    """GET one endpoint for one wallet; identical concurrent requests – from
+    any session or thread – go out once and share the answer."""
+    key = (endpoint, wallet.lower(), tuple(sorted(params.items())))
+    return _FLIGHTS.do(key, lambda: _fetch_json(endpoint, wallet, params, headers))
+
+
+def _fetch_json(endpoint: str, wallet: str, params: dict, headers: dict):
+    r = safe_get(f"{API}/{endpoint}", {"id": wallet, **params}, headers)
+    if r.status_code != 200:
+        raise DebankError(
+            f"Debank {wallet[:6]}…{wallet[-4:]} {endpoint}: "
+            f"{r.status_code} – {r.text[:100]}"
+        )
+    return r.json()
+
+
+def all_token_list(wallet: str, chain_ids: list[str], headers: dict) -> list[dict]:
+    return _get_json("all_token_list", wallet,
+                     {"chain_ids": ",".join(chain_ids), "is_all": False}, headers)
+
+
+def all_complex_protocol_list(wallet: str, chain_ids: list[str], headers: dict) -> list[dict]:
+    return _get_json("all_complex_protocol_list", wallet,
+                     {"chain_ids": ",".join(chain_ids)}, headers)
+
+
+# ───────────── per-chain endpoints ─────────────
+# cheaper than the all_* calls when only a few chains are wanted; see
+# engine.debank_tokens / debank_protocols
+def used_chain_list(wallet: str, headers: dict) -> list[str]:
+    """Ids of the chains ``wallet`` has ever been active on."""
+    return [c["id"] for c in _get_json("used_chain_list", wallet, {}, headers)]
+
+
+def token_list(wallet: str, chain_id: str, headers: dict) -> list[dict]:
+    return _get_json("token_list", wallet, {"chain_id": chain_id, "is_all": False}, headers)
+
+
+def complex_protocol_list(wallet: str, chain_id: str, headers: dict) -> list[dict]:
+    return _get_json("complex_protocol_list", wallet, {"chain_id": chain_id}, headers)
+
+
+# ───────────── active-chains index ─────────────
+_CHAINS_POOL       = ThreadPoolExecutor(max_workers=2, thread_name_prefix="debank-chains")
+_chains_lock       = threading.Lock()
+_chains_refreshing = set()      # lower-case wallets with a background refresh queued
+_chains_failed     = {}         # lower-case wallet → when its last refresh failed
+
+
+def _refresh_chains(wallet: str, headers: dict) -> set[str] | None:
+    """used_chain_list of one wallet, saved to the store; None (and a retry pause) on failure."""
+    try:
+        chains = set(used_chain_list(wallet, headers))
+    except (DebankError, requests.RequestException) as e:
+        log.warning("active chains of %s not refreshed: %s", wallet, e)
+        with _chains_lock:
+            _chains_failed[wallet.lower()] = time.time()
+        return None
+    store.save_active_chains({wallet: chains})
+    with _chains_lock:
+        _chains_failed.pop(wallet.lower(), None)
+    return chains
+
+
+def _refresh_chains_later(wallet: str, headers: dict) -> None:
+    with _chains_lock:
+        if wallet.lower() in _chains_refreshing:
+            return
+        _chains_refreshing.add(wallet.lower())
+
+    def job():
+        try:
+            _refresh_chains(wallet, headers)
+        finally:
+            with _chains_lock:
+                _chains_refreshing.discard(wallet.lower())
+
+    _CHAINS_POOL.submit(job)
+
+
+def active_chains(wallets: list[str], headers: dict,
+                  max_in_flight: int = MAX_IN_FLIGHT) -> dict[str, set[str] | None]:
+    """
+    {wallet: chain ids it has been active on}, used to narrow the chains
+    asked for per wallet.  Lists live in the local store and are refreshed
+    from used_chain_list once they are ``ACTIVE_CHAINS_TTL`` old, so a
+    chain a wallet starts using shows up within a day.  An old list is
+    served as is while it refreshes in the background – only wallets we
+    know nothing about are fetched before returning, and one that still
+    can't be fetched maps to None (meaning: don't narrow).  A wallet whose
+    refresh failed is not retried for ``ACTIVE_CHAINS_RETRY`` seconds.
+    """
+    known = store.read_active_chains(wallets)
+    now   = time.time()
+    with _chains_lock:
+        failed = dict(_chains_failed)
+    due   = [w for w in dict.fromkeys(wallets)
+             if (w.lower() not in known or now - known[w.lower()][1] >= ACTIVE_CHAINS_TTL)
+             and now - failed.get(w.lower(), 0) >= ACTIVE_CHAINS_RETRY]
+
+    unknown = [w for w in due if w.lower() not in known]
+    for w in due:
+        if w.lower() in known:
+            _refresh_chains_later(w, headers)
+    fresh = dict(zip(unknown, fetch_wallets(unknown, lambda w: _refresh_chains(w, headers),
+                                            max_in_flight=max_in_flight)[0] if unknown else []))
+    out = {}
+    for w in wallets:
+        chains = fresh.get(w)
+        if chains is None and w.lower() in known:
+            chains = known[w.lower()][0]
+        out[w] = chains
+    return out
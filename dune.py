@@ -0,0 +1,87 @@
+"""
+Dune Analytics helpers shared by the dashboards and the headless collector.
+
+Results are read page by page (``limit`` / ``offset``, following the
+``next_uri`` Dune hands back) so a large result never has to arrive in one
+response within one timeout, and each page is turned into a DataFrame
+chunk as it lands.  The CSV results format is the default for frames: it
+is smaller on the wire and parsed by pandas' C reader.
+"""
+import io
+from typing import Iterator
+
+import pandas as pd
+import requests
+
+API       = "https://api.dune.com/api/v1"
+PAGE_SIZE = 10_000          # rows per results page
+
+
+class DuneError(RuntimeError):
+    """Non-200 answer from Dune; ``status`` is the HTTP status code."""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+def _first_url(query_id, fmt: str) -> str:
+    return f"{API}/query/{query_id}/results" + ("/csv" if fmt == "csv" else "")
+
+
+def iter_pages(query_id, api_key: str, fmt: str = "json", page_size: int = PAGE_SIZE,
+               filters: str | None = None, timeout: int = 15) -> Iterator:
+    """
+    Yield the latest stored result of a saved query one page at a time –
+    a list of row dicts for ``fmt="json"``, a DataFrame for ``fmt="csv"``.
+    ``filters`` is passed through to Dune (e.g. ``day >= '2025-01-01'``).
+    """
+    headers = {"X-Dune-API-Key": api_key}
+    url     = _first_url(query_id, fmt)
+    params  = {"limit": page_size, **({"filters": filters} if filters else {})}
+    while url:
+        r = requests.get(url, params=params, headers=headers, timeout=timeout)
+        if r.status_code != 200:
+            raise DuneError(f"Dune query {query_id}: {r.status_code} – {r.text[:100]}", r.status_code)
+        if fmt == "csv":
+            # only empty cells are missing – a symbol like "NA" stays a string
+            yield (pd.read_csv(io.StringIO(r.text), keep_default_na=False, na_values=[""])
+                   if r.text.strip() else pd.DataFrame())
+            url = r.headers.get("x-dune-next-uri")
+        else:
+            resp = r.json()
+            if "result" not in resp:
+                raise RuntimeError(f"Dune query {query_id}: {resp.get('error', resp)}")
+            yield resp["result"]["rows"]
+            url = resp.get("next_uri")
+        params = None                   # next_uri already carries limit / offset / filters
+
+
+def query_rows(query_id, api_key: str, timeout: int = 15, filters: str | None = None) -> list[dict]:
+    """All rows of the latest stored result of a saved Dune query, as dicts."""
+    return [row for page in iter_pages(query_id, api_key, "json", filters=filters, timeout=timeout)
+            for row in page]
+
+
+def query_frame(query_id, api_key: str, fmt: str = "csv", dtypes: dict | None = None,
+                filters: str | None = None, timeout: int = 15) -> pd.DataFrame:
+    """
+    The latest stored result as one DataFrame, built page by page;
+    ``dtypes`` (column → dtype) is applied to every chunk as it arrives.
+    """
+    chunks = []
+    for page in iter_pages(query_id, api_key, fmt, filters=filters, timeout=timeout):
+        chunk = page if fmt == "csv" else pd.DataFrame(page)
+        if dtypes:
+            chunk = chunk.astype({c: t for c, t in dtypes.items() if c in chunk.columns})
+        chunks.append(chunk)
+    chunks = [c for c in chunks if not c.empty]
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def fetch_prices(query_id, api_key: str) -> dict:
+    """Return {token_symbol: usd_price} from the price query."""
+    df = query_frame(query_id, api_key, dtypes={"usd_price": "float64"})   # token_symbol | usd_price
+    if df.empty:
+        return {}
+    return dict(zip(df["token_symbol"].astype(str), df["usd_price"].tolist()))
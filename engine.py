@@ -0,0 +1,966 @@
+"""
+Dashboard engine – one module that renders any tenant from ``tenants.py``.
+
+    import engine; engine.render("vault_dashboard_usd")
+
+All loaders cache at module level – Sheets reads in ``st.cache_data``,
+Debank responses and Dune prices in ``swr.SWRCache`` instances, Dune
+rewards and the history sheets in the local store (``store.py``) – keyed
+by worksheet name / wallet, so a single Streamlit process (``app.py``) can
+serve every tenant and a wallet that appears in several tenants is
+fetched only once.
+"""
+import streamlit as st, pandas as pd, plotly.express as px, json
+import datetime, itertools, time
+from requests import RequestException
+import debank, dune, sheets, store, swr, timing
+from debank import fetch_wallets
+from portfolio import (COLS_PROTO, filter_frames,
+                       offchain_frame, parse_wallets, protocol_frame, read_portfolio_snapshot,
+                       token_categories, token_rows, wallet_frame, write_history_snapshot)
+from tenants import CHAIN_NAMES, TENANTS, chain_names
+
+# ───────────────────────── CONFIG ────────────────────────────
+TOKEN_LOGOS = {
+    "GHO": "https://static.debank.com/image/eth_token/logo_url/0x40d16fc0246ad3160ccc09b8d0d3a2cd28ae6c2f/1fd570eeab44b1c7afad2e55b5545c42.png",
+    "AAVE": "https://static.debank.com/image/eth_token/logo_url/0x7fc66500c84a76ad7e9c93437bfc5ac33e2ddae9/7baf403c819f679dc1c6571d9d978f21.png",
+    "PENDLE": "https://static.debank.com/image/eth_token/logo_url/0x808507121b80c02388fad14726482e061b8da827/b9351f830cd0a6457e489b8c685f29ad.png",
+    "SSV": "https://static.debank.com/image/eth_token/logo_url/0x9d65ff81a3c488d585bbfb0bfe3c7707c7917f54/2a91cd614844f7c9596c6fbcff85c57c.png",
+    "USDC": "https://static.debank.com/image/arb_token/logo_url/0xaf88d065e77c8cc2239327c5edb3a432268e5831/fffcd27b9efff5a86ab942084c05924d.png",
+    "weETH": "https://static.debank.com/image/eth_token/logo_url/0xcd5fe23c85820f7b72d0926fc9b05b43e359b7ee/6c02f6b3bcd264d433c3676100ad8da6.png",
+    "ARB": "https://static.debank.com/image/arb_token/logo_url/0x912ce59144191c1204e64559fe8253a0e49e6548/7623afc27299327fdb0b090fd67e8ff4.png",
+    "TANGO": "https://static.debank.com/image/arb_token/logo_url/0xc760f9782f8cea5b06d862574464729537159966/caa8d2a11e12302dd5db9b4496cf849c.png",
+    "BASED (unknown)": "https://static.debank.com/image/base_token/logo_url/0x07d15798a67253d76cea61f0ea6f57aedc59dffb/892d5d2a0dafb79d97e451760536f528.png",
+    "BRIAN": "https://static.debank.com/image/base_token/logo_url/0x3ecced5b416e58664f04a39dd18935eb71d33b15/5ba04e3a667df4d5a7c4cc4423015663.png",
+    "WETH": "https://static.debank.com/image/swell_token/logo_url/swell/48bfb74adddd170e936578aec422836d.png",
+    "SNL": "https://static.debank.com/image/base_token/logo_url/0xc5a861787f3e173f2b004d5cfa6a717f5dc5484d/c5f500748fb1f999384eccdfc08e0b4f.png",
+    "cbBTC": "https://static.debank.com/image/base_token/logo_url/0xcbb7c0000ab88b473b1f5afd9ef808440eed33bf/a4ae837a6ca2fc45f07a74898cc4ba45.png",
+    "XOLO": "https://static.debank.com/image/base_token/logo_url/0xf7cebf7df90a1c59fd0347c41b983846ca8bc76a/51d20d495ea3d5980a1fdbdb38f8515d.png",
+    "WCT": "https://static.debank.com/image/op_token/logo_url/0xef4461891dfb3ac8572ccf7c794664a8dd927945/542a47c09c9a133f5a428f17fee817b9.png",
+    "MOVE": "https://static.debank.com/image/eth_token/logo_url/0x3073f7aaa4db83f95e9fff17424f71d4751a3073/6d2af9409a5e10490b694fbb3ad0a854.png",
+    "USDe": "https://static.debank.com/image/eth_token/logo_url/0x4c9edd5852cd905f086c759e8383e09bff1e68b3/1228d6e73f70f37ec1f6fe02a3bbe6ff.png",
+    "ZKJ": "https://static.debank.com/image/eth_token/logo_url/0xc71b5f631354be6853efe9c3ab6b9590f8302e81/840fb61af52d5ffb9cc3ecabbf6b8eba.png",
+    "ETHFI": "https://static.debank.com/image/eth_token/logo_url/0xfe0c30065b384f05761f15d0cc899d4f9f9cc0eb/51f0cde8e655b6dd4cc39f2495b60c1e.png",
+    "ETH": "https://static.debank.com/image/coin/logo_url/eth/6443cdccced33e204d90cb723c632917.png",
+    "USDC(Bridged)": "https://static.debank.com/image/avax_token/logo_url/0xa7d7079b0fead91f3e65f86e8915cb59c1a4c664/c1503ade9d53497fe93ca9f2723c56a1.png",
+    "LWFI (unknown)": "https://static.debank.com/image/base_token/logo_url/0x2953ca1174b41b28439ef1155235fa699d7b75ba/906f45d8fadf689ebb38708780f057df.png",
+    "9MM": "https://static.debank.com/image/base_token/logo_url/0x340c070260520ae477b88caa085a33531897145b/1e66cba98b954bade18a7678399575ba.png",
+    "WAZ": "https://static.debank.com/image/base_token/logo_url/0x5efc4446e1d772428adbd6053a0421ca7b3ed85a/5fc0ecbd399a1cb8a4c212f3b5e1183f.png",
+    "SKYA": "https://static.debank.com/image/base_token/logo_url/0x623cd3a3edf080057892aaf8d773bbb7a5c9b6e9/b82923ee85a1f6477eed780357b3484c.png",
+    "WIF": "https://static.debank.com/image/base_token/logo_url/0x7f6f6720a73c0f54f95ab343d7efeb1fa991f4f7/f471e8295e99101458756f0b3b25089a.png",
+    "Blue": "https://static.debank.com/image/base_token/logo_url/0x891502ba08132653151f822a3a430198f1844115/daf0928bc9af7973d38f7023048dc7f5.png",
+    "GOOFS": "https://static.debank.com/image/base_token/logo_url/0x8e5c04f82d6464b420e2018362e7e7ab813cf190/d77975b1e290f3738bc137451be6f63a.png",
+    "BDOGE": "https://static.debank.com/image/base_token/logo_url/0xb3ecba1330fe26bb36f40344992c481c2c916f23/2de0ba94bf560c048c838c114313e0e1.png",
+    "USA(BASED USA)": "https://static.debank.com/image/base_token/logo_url/0xb56d0839998fd79efcd15c27cf966250aa58d6d3/68b9dd7a75a01feb4fb33e095bdbefe7.png",
+    "toby": "https://static.debank.com/image/base_token/logo_url/0xb8d98a102b0079b69ffbc760c8d857a31653e56e/82bdb31b9d8feb9343fda93d84496666.png",
+    "BOOMER (baseboomer.com)": "https://static.debank.com/image/base_token/logo_url/0xcde172dc5ffc46d228838446c57c1227e0b82049/cfe0b2eaae96b4cffb5f69fc5a4e0494.png",
+    "GURMY": "https://static.debank.com/image/base_token/logo_url/0xd8c3590204d9442a5746f45f3d1e2befea147da0/c91fcf2adbe38e67c20f2599497d710f.png",
+    "ITRUMP": "https://static.debank.com/image/base_token/logo_url/0xf389724b320ea4dbc03b8122d61052e1284a65dc/09722fea849ef563b0c3ef8f8a1c2d36.png",
+    "WGC": "https://static.debank.com/image/base_token/logo_url/0xfb18511f1590a494360069f3640c27d55c2b5290/e4e4e71f748f382b923eba77319f57cc.png",
+    "Boe": "https://static.debank.com/image/base_token/logo_url/0xff62ddfa80e513114c3a0bf4d6ffff1c1d17aadf/d00693431917e61b8212faa500fd0040.png",
+    "WBTC": "https://static.debank.com/image/eth_token/logo_url/0x2260fac5e5542a773aa44fbcfedf7c193bc2c599/d3c52e7c7449afa8bd4fad1c93f50d93.png",
+    "NURI": "https://static.debank.com/image/scrl_token/logo_url/0xaaae8378809bb8815c08d3c59eb0c7d1529ad769/a8d3cd4269ca15424452a19e7cad8606.png",
+    "SCR": "https://static.debank.com/image/scrl_token/logo_url/0xd29687c813d741e2f938f4ac377128810e217b1b/0eabb4976c99ba1e66fdb9b3e5139dcf.png",
+    "weETH(layerzero)": "https://static.debank.com/image/eth_token/logo_url/0xcd5fe23c85820f7b72d0926fc9b05b43e359b7ee/6c02f6b3bcd264d433c3676100ad8da6.png",
+    "LARRY": "https://static.debank.com/image/op_token/logo_url/0xad984fbd3fb10d0b47d561be7295685af726fdb3/90e2cbc96bad26f4d61dde311f8e5f9c.png",
+    "HIM": "https://static.debank.com/image/bera_token/logo_url/0x047b41a14f0bef681b94f570479ae7208e577a0c/72f22b3d1ef38a5b660be2863f58c7f4.png",
+    "BTC(meme)": "https://static.debank.com/image/bera_token/logo_url/0x0d9ac083dd2760943f773e70ebffe621e950871c/7b0559804701886be6973080a7a5d7a0.png",
+    "BERA": "https://static.debank.com/image/bera_token/logo_url/bera/89db55160bb8bbb19464cabf17e465bc.png",
+    "GRG": "https://static.debank.com/image/eth_token/logo_url/0x4fbb350052bca5417566f188eb2ebce5b19bc964/0fbf2e6f706029bde207be5e10dc6040.png",
+    "EIGEN": "https://static.debank.com/image/project/logo_url/eigenlayer/60961d60d58c7619cf845ff06b2236af.png"
+}
+PROTOCOL_LOGOS = {
+    "Aave V3":           "https://static.debank.com/image/project/logo_url/aave3/54df7839ab09493ba7540ab832590255.png",
+    "Aerodrome":         "https://static.debank.com/image/project/logo_url/base_aerodrome/f02d753bc321dc8ba480f0424a686482.png",
+    "Curve":             "https://static.debank.com/image/project/logo_url/curve/aa991be165e771cff87ae61e2a61ef68.png",
+    "ether.fi":          "https://static.debank.com/image/project/logo_url/etherfi/6c3ea6e8f02322fa9b417e0726978c41.png",
+    "Fluid":             "https://static.debank.com/image/project/logo_url/fluid/faeb92cc788df0676eb21db724f80704.png",
+    "Curve LlamaLend":   "https://static.debank.com/image/project/logo_url/curve/aa991be165e771cff87ae61e2a61ef68.png",
+    "Pendle V2":         "https://static.debank.com/image/project/logo_url/pendle2/d5cfacd3b8f7e0ec161c0de9977cabbd.png",
+    "Merkl":             "https://static.debank.com/image/project/logo_url/merkl/7c4a97689b3310cc3436bc6e1a215476.png",
+    "Venus":             "https://static.debank.com/image/project/logo_url/bsc_venus/07de2297c7aec45b2d52d9e75754789f.png",
+    "Balancer V2":       "https://static.debank.com/image/project/logo_url/balancer2/4318f98916b139a44996fc06531e9074.png",
+    "Aerodrome V3":      "https://static.debank.com/image/project/logo_url/base_aerodrome/f02d753bc321dc8ba480f0424a686482.png",
+    "Cygnus Finance":    "https://static.debank.com/image/project/logo_url/base_cygnus/e06bf44972afa9a00a230dd537975223.png",
+    "Maverick V2":       "https://static.debank.com/image/project/logo_url/maverick/a7a186ccd39807ad670d5ead78effb4e.png",
+    "Convex":            "https://static.debank.com/image/project/logo_url/convex/f7de1d568d41ea275b35558c391ab86c.png",
+    "LIDO":              "https://static.debank.com/image/project/logo_url/lido/081388ebc44fa042561749bd5338d49e.png",
+    "Optimism Bridge":   "https://static.debank.com/image/project/logo_url/optimism_bridge/5b42ae489cd2181dd500137c21ca00e2.png",
+    "NURI Exchange":     "https://static.debank.com/image/project/logo_url/scrl_nuri/a8d3cd4269ca15424452a19e7cad8606.png",
+    "Silo":              "https://static.debank.com/image/project/logo_url/silo/c1c547e12ac67b71dcf555f4fba77210.png",
+    "SushiSwap":         "https://static.debank.com/image/project/logo_url/sushiswap/248a91277aac1ac16a457b8f61957089.png",
+    "Yearn V2":          "https://static.debank.com/image/project/logo_url/yearn2/b0f88529a907964dbbf154337906db19.png",
+}
+COLOR_JSON = {
+    "Ethereum":"#627EEA","Arbitrum":"#28A0F0","Base":"#0052FF","Scroll":"#FEDA03",
+    "Curve":"#FF007A","Aave":"#B6509E","Lido":"#00A3FF","Aerodrome":"#1AAB9B",
+    "ether.fi":"#800DEE","Aave V3":"#B6509E","ETH":"#627EEA","Stables":"#2775ca",
+}
+BLOCKCHAIN_LOGOS = {
+    "Optimism"  : "https://static.debank.com/image/chain/logo_url/op/68bef0c9f75488f4e302805ef9c8fc84.png",
+    "Arbitrum"  : "https://static.debank.com/image/chain/logo_url/arb/854f629937ce94bebeb2cd38fb336de7.png",
+    "BNB Chain" : "https://static.debank.com/image/chain/logo_url/bsc/bc73fa84b7fc5337905e527dadcbc854.png",
+    "Ethereum"  : "https://static.debank.com/image/chain/logo_url/eth/42ba589cd077e7bdd97db6480b0ff61d.png",
+    "Base"      : "https://static.debank.com/image/chain/logo_url/base/ccc1513e4f390542c4fb2f4b88ce9579.png",
+    "Berachain" : "https://static.debank.com/image/chain/logo_url/bera/89db55160bb8bbb19464cabf17e465bc.png",
+    "Celo"      : "https://static.debank.com/image/chain/logo_url/celo/faae2c36714d55db1d7a36aba5868f6a.png",
+    "MobileCoin": "https://static.debank.com/image/chain/logo_url/mobm/fcfe3dee0e55171580545cf4d4940257.png",   # mobm
+    "Scroll"    : "https://static.debank.com/image/chain/logo_url/scrl/1fa5c7e0bfd353ed0a97c1476c9c42d2.png",
+    "Gnosis"    : "https://static.debank.com/image/chain/logo_url/xdai/43c1e09e93e68c9f0f3b132976394529.png",   # xdai
+    "Blast"     : "https://static.debank.com/image/chain/logo_url/blast/15132294afd38ce980639a381ee30149.png",
+    "Linea"     : "https://static.debank.com/image/chain/logo_url/linea/32d4ff2cf92c766ace975559c232179c.png",
+    "Polygon"   : "https://static.debank.com/image/chain/logo_url/matic/52ca152c08831e4765506c9bd75767e8.png",
+    "zkSync Era": "https://static.debank.com/image/chain/logo_url/era/2cfcd0c8436b05d811b03935f6c1d7da.png",
+    "Fantom"    : "https://static.debank.com/image/chain/logo_url/ftm/14133435f89637157a4405e954e1b1b2.png",
+    "Proof-of-Play Zealy": "https://static.debank.com/image/chain/logo_url/pze/a2276dce2d6a200c6148fb975f0eadd3.png",  # pze
+    "Avalanche" : "https://static.debank.com/image/chain/logo_url/avax/4d1649e8a0c7dec9de3491b81807d402.png",
+    "Corn"      : "https://static.debank.com/image/chain/logo_url/corn/2ac7405fee5fdeee5964ba0bcf2216f4.png",
+    "Klaytn"    : "https://static.debank.com/image/chain/logo_url/klay/4182ee077031d843a57e42746c30c072.png",
+    "Mode"      : "https://static.debank.com/image/chain/logo_url/mode/466e6e12f4fd827f8f497cceb0601a5e.png",
+    "Katana"    : "https://static.debank.com/image/chain/logo_url/katana/0202d6aecd963a9c0b2afb56c4d731b5.png",
+    "Plasma"    : "https://static.debank.com/image/chain/logo_url/plasma/baafefce3b9d43b12b0c016f30aff140.png",
+    "SwellChain": "https://static.debank.com/image/chain/logo_url/swell/3e98b1f206af5f2c0c2cc4d271ee1070.png",
+}
+
+# ──────── CSS for fixed-width tables ────────
+TABLE_CSS = """
+<style>
+table {table-layout:fixed;width:100%}
+
+/* keep long text from overflowing */
+th,td {overflow:hidden;text-overflow:ellipsis;white-space:nowrap}
+
+/* new column widths – order: Wallet | Chain | Token | Token Balance | USD Value */
+th:nth-child(1), td:nth-child(1) {width:15%}   /* Wallet  */
+th:nth-child(2), td:nth-child(2) {width:15%}   /* Chain   */
+th:nth-child(3), td:nth-child(3) {width:35%}   /* Token   */
+th:nth-child(4), td:nth-child(4) {width:25%}   /* Token Balance */
+th:nth-child(5), td:nth-child(5) {width:10%}   /* USD Value */
+
+</style>"""
+
+# ───────────── Google-Sheets helpers ─────────────
+def _sheet():
+    """Process-wide spreadsheet handle (see sheets.py)."""
+    return sheets.spreadsheet(json.loads(st.secrets["gcp_service_account"]),
+                              st.secrets["sheet_id"])
+
+@timing.timed("sheets config", cached=True)
+@st.cache_data(ttl=600, show_spinner=False)
+def load_config_sheets(addresses: str, offchain: str) -> dict[str, tuple[list, str | None]]:
+    """
+    Pull every configuration worksheet of a tenant – addresses (col A),
+    token_category (cols A:B) and the off-chain sheet – with a single
+    values:batchGet and return ``{sheet: (rows, error)}`` for the parsers
+    below.
+    """
+    ranges = {
+        addresses:        sheets.a1(addresses, "A:A"),
+        "token_category": sheets.a1("token_category", "A:B"),
+        offchain:         sheets.a1(offchain),
+    }
+    timing.miss("sheets config")
+    try:
+        values, errors = sheets.batch_get(_sheet(), list(ranges.values()))
+    except Exception as e:                      # auth / network → every sheet fails alike
+        values, errors = [[]] * len(ranges), [str(e)] * len(ranges)
+    return {name: (v, err) for name, v, err in zip(ranges, values, errors)}
+
+def load_wallets(conf: dict, sheet: str) -> list[str]:
+    """
+    Read the tenant's addresses worksheet (col A) and return only well-formed
+    0x…40-hex-char addresses.
+
+    ── Behaviour ─────────────────────────────────────────────
+      • On Google-Sheets error → warn once and return [].
+      • On malformed rows     → warn with a short preview; bad rows are skipped.
+      • If no valid rows left → warn once and return [] (dashboard will still
+                                run, there’ll just be no on-chain data).
+    """
+    # 1) raw column values from the batch read
+    rows, err = conf[sheet]
+    if err:
+        st.warning(f"⚠️ Unable to read the *{sheet}* sheet – {err}")
+        return []
+    raw = [r[0] if r else "" for r in rows]
+
+    # 2) separate good vs. bad rows
+    good, bad = parse_wallets(raw)
+
+    if bad:
+        preview = ", ".join(bad[:3]) + ("…" if len(bad) > 3 else "")
+        st.warning(f"⚠️ Ignored {len(bad)} malformed address(es): {preview}")
+
+    if not good:
+        st.warning("⚠️ No valid wallet addresses found in the sheet.")
+    return good
+
+# ───────────── Dune helpers ─────────────
+PRICE_TTL = 600                            # seconds before prices are refreshed
+# never expires: past the TTL the last good prices are served while a
+# background refresh runs, so a Dune outage can't drop the off-chain rows
+_PRICES = swr.SWRCache(PRICE_TTL, float("inf"), workers=1, name="dune-prices")
+
+@timing.timed("dune prices", cached=True)
+def dune_prices() -> dict:
+    """Return {token_symbol: usd_price} from the Dune query."""
+    qid, key = st.secrets["DUNE_QUERY_ID"], st.secrets["DUNE_API_KEY"]
+
+    def fetch():
+        timing.miss("dune prices")
+        return dune.fetch_prices(qid, key)
+    try:
+        return _PRICES.get(("prices", qid), fetch)[0]
+    except Exception as e:
+        st.warning(f"⚠️ Dune price fetch failed ({e}) – off-chain balances skipped.")
+        return {}
+
+def dune_prices_fetched_at() -> datetime.datetime | None:
+    """When the prices ``dune_prices`` serves were fetched (UTC), None before the first fetch."""
+    ts = _PRICES.stamp(("prices", st.secrets["DUNE_QUERY_ID"]))
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc) if ts else None
+
+REWARDS_SYNC_EVERY = 600                   # seconds between incremental rewards fetches
+
+def tidy_rewards(rows: list[dict] | pd.DataFrame) -> pd.DataFrame:
+    """Dune rewards rows → day (UTC), protocol, rewards_usd (float); bad rows dropped."""
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return pd.DataFrame(columns=["day","protocol","rewards_usd"])
+
+    # normalize & coerce
+    df.columns = [c.strip().lower() for c in df.columns]
+    df["day"] = pd.to_datetime(df["day"], utc=True, errors="coerce")
+    df["protocol"] = df["protocol"].astype(str)
+    # handle values like "2,753"
+    df["rewards_usd"] = pd.to_numeric(
+        df["rewards_usd"].astype(str).str.replace(",", ""),
+        errors="coerce"
+    )
+    return df.dropna(subset=["day", "protocol", "rewards_usd"])[["day","protocol","rewards_usd"]]
+
+@timing.timed("dune rewards", cached=True)
+def dune_rewards(query_secret: str) -> pd.DataFrame:
+    """
+    Returns a tidy DataFrame with columns: day (UTC), protocol, rewards_usd (float)
+    Requires st.secrets[query_secret] and st.secrets["DUNE_API_KEY"].
+
+    Rows accumulate in the local store (store.py); every REWARDS_SYNC_EVERY
+    seconds only rows from the latest stored day on are requested from Dune
+    (that day is re-read as it may still be growing).  A failed sync is
+    recorded too, so during a Dune outage it is retried only every
+    REWARDS_SYNC_EVERY seconds.
+    """
+    api = st.secrets["DUNE_API_KEY"]
+    qid = st.secrets[query_secret]
+    try:
+        last_day, synced_at = store.rewards_state(qid)
+        if synced_at is None or time.time() - synced_at >= REWARDS_SYNC_EVERY:
+            timing.miss("dune rewards")
+            try:
+                since = last_day
+                rows  = dune.query_frame(qid, api, timeout=20,
+                                         filters=f"day >= '{since:%Y-%m-%d %H:%M:%S}'" if since else None)
+            except dune.DuneError as e:
+                if since is None or not 400 <= e.status < 500:
+                    raise
+                # Dune rejected the filter – read the full result, as before
+                since, rows = None, dune.query_frame(qid, api, timeout=20)
+            store.add_rewards(qid, tidy_rewards(rows), since=since)
+    except Exception as e:
+        try:
+            store.mark_rewards_synced(qid)
+        except Exception:
+            pass
+        st.warning(f"⚠️ Dune rewards fetch failed ({e}) – showing stored rewards.")
+    try:
+        return store.read_rewards(qid)
+    except Exception:
+        return pd.DataFrame(columns=["day","protocol","rewards_usd"])
+
+# ───────────── helpers ─────────────
+def link_wallet(a):  return f"[{a[:6]}…{a[-4:]}](https://debank.com/profile/{a})"
+def fmt_usd(v: float) -> str:
+    sign = "-" if v < 0 else ""          
+    v = abs(v)
+    if v >= 1e6:
+        return f"{sign}${v/1e6:.2f}M"
+    if v >= 1e3:
+        return f"{sign}${v/1e3:.1f}K"
+    return     f"{sign}${v:,.0f}"
+
+# ───────────── token-category lookup ─────────────
+def load_token_categories(conf: dict) -> dict[str, str]:
+    """
+    Parse the *token_category* sheet (col A = keyword, col B = category)
+    into a mapping { keyword_lower : CategoryName }.
+    """
+    values, err = conf["token_category"]
+    if err:
+        st.warning(f"⚠️ Unable to read *token_category* sheet – {err}")
+        return {}
+    return token_categories(values)
+
+# wallet-balances table: sortable columns (first = default) and page sizes
+WALLET_SORT_COLS  = ["USD Value", "Token Balance", "Token", "Chain", "Wallet"]
+WALLET_PAGE_SIZES = [50, 100, 250, 1000]
+MAX_TABLE_ROWS = 500          # rows per Markdown table; larger frames are cut with a note
+
+def md_table(df,cols,max_rows=MAX_TABLE_ROWS):
+    """
+    Markdown table of ``df[cols]``.  Cells are stringified and joined a
+    whole column at a time; only the first ``max_rows`` rows are emitted
+    (``None`` = all) and a note says how many were left out.
+    """
+    hdr="| "+" | ".join(cols)+" |"; sep="| "+" | ".join("---" for _ in cols)+" |"
+    body=df[cols] if max_rows is None else df[cols].head(max_rows)
+    if body.empty: return "\n".join([hdr,sep])
+    cells=body.astype(str)
+    rows="| "+cells.iloc[:,0]
+    for i in range(1,len(cols)): rows=rows+" | "+cells.iloc[:,i]
+    out="\n".join([hdr,sep,*(rows+" |").tolist()])
+    hidden=len(df)-len(body)
+    return out+(f"\n\n_… {hidden:,} more row{'s'*(hidden>1)} not shown_" if hidden else "")
+def token_cells(tokens: pd.Series, chains: pd.Series) -> pd.Series:
+    """Token column HTML: logo (token's, else the chain's) followed by the symbol."""
+    logo = tokens.map(TOKEN_LOGOS).fillna(chains.map(BLOCKCHAIN_LOGOS)).fillna("")
+    return ('<img src="' + logo + '" width="16" style="vertical-align:middle;margin-right:4px;"> '
+            + tokens.astype(str))
+def lp_table(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Liquidity-pool positions → one row per Pool: duplicate token rows
+    (supply + reward) are summed and the pool's tokens / balances joined
+    with " + ".  Wallet and Chain come from the pool's first token (by
+    symbol); sorted by USD value, descending.
+    """
+    tok = (rows.groupby(["Pool", "Token"])
+               .agg(**{"USD Value":     ("USD Value", "sum"),
+                       "Token Balance": ("Token Balance", "sum"),
+                       "Wallet":        ("Wallet", "first"),
+                       "Chain":         ("Chain", "first")})
+               .reset_index())
+    head  = tok.drop_duplicates("Pool").set_index("Pool")   # first token row of every pool
+    chain = tok["Pool"].map(head["Chain"])
+    tok["cell"] = token_cells(tok["Token"], chain)
+    tok["bal"]  = tok["Token Balance"].map(lambda x: f"{x:,.4f}") + " " + tok["Token"].astype(str)
+
+    pools = tok.groupby("Pool")
+    return (pd.DataFrame({
+                "Wallet":        head["Wallet"].map(link_wallet),
+                "Chain":         head["Chain"],
+                "Token":         pools["cell"].agg(" + ".join),
+                "Token Balance": pools["bal"].agg(" + ".join),
+                "USD Value":     pools["USD Value"].sum(),
+            })
+            .reset_index(drop=True)
+            .sort_values("USD Value", ascending=False))
+
+# ───────────── page aggregates & tables ─────────────
+# shared by render() and benchmarks/run.py, so the benchmark times the page's own code
+TABLE_COLS = ["Wallet", "Chain", "Token", "Token Balance", "USD Value"]
+
+def chain_totals(df_wallets: pd.DataFrame, df_protocols: pd.DataFrame) -> pd.Series:
+    """USD value per chain, largest first."""
+    w_by_chain = df_wallets.groupby("Chain", dropna=False)["USD Value"].sum()
+    p_by_chain = df_protocols.groupby("Blockchain", dropna=False)["USD Value"].sum()
+    # add(..., fill_value=0) so chains present in only one source don't turn into NaN
+    return w_by_chain.add(p_by_chain, fill_value=0).astype(float).sort_values(ascending=False)
+
+def protocol_totals(df_wallets: pd.DataFrame, df_protocols: pd.DataFrame) -> pd.Series:
+    """USD value per protocol plus a "Wallet Balances" entry, largest first."""
+    proto_sum = df_protocols.groupby("Protocol")["USD Value"].sum()
+    proto_sum.loc["Wallet Balances"] = df_wallets["USD Value"].sum()
+    return proto_sum.astype(float).sort_values(ascending=False)
+
+def sort_wallets(df: pd.DataFrame, sort_by: str, desc: bool) -> pd.DataFrame:
+    """Wallet rows sorted on ``sort_by``; text columns compare case-insensitively."""
+    return df.sort_values(sort_by, ascending=not desc,
+                          key=lambda s: s.str.lower() if s.dtype == object else s)
+
+def wallet_page(df: pd.DataFrame, first: int, per_page: int) -> pd.DataFrame:
+    """Rows ``first``…``first + per_page`` of sorted wallet rows, formatted for ``md_table``."""
+    page = df.iloc[first:first + per_page].copy()
+    page["USD Value"]     = page["USD Value"].apply(fmt_usd)
+    page["Token Balance"] = page["Token Balance"].apply(lambda x: f"{x:,.4f}")
+    page["Wallet"]        = page["Wallet"].apply(link_wallet)
+    page["Token"]         = token_cells(page["Token"], page["Chain"])
+    return page[TABLE_COLS]
+
+def protocol_sections(df_protocols: pd.DataFrame) -> list[tuple[str, float, list[tuple[str, pd.DataFrame]]]]:
+    """
+    The protocol-positions section: ``[(protocol, total, [(classification,
+    rows)])]``, protocols and classifications by USD value, rows formatted
+    for ``md_table``.  One stable sort, one formatting pass and one groupby
+    over the whole frame; every sub-table is a positional slice of it.
+    """
+    raw = (df_protocols.rename(columns={"Blockchain": "Chain"})
+                       .reset_index(drop=True)
+                       .sort_values("USD Value", ascending=False, kind="stable"))
+    shown = pd.DataFrame({
+        "Wallet":        raw["Wallet"].map(link_wallet),
+        "Chain":         raw["Chain"],
+        "Token":         token_cells(raw["Token"], raw["Chain"]),
+        "Token Balance": raw["Token Balance"].map(lambda x: f"{x:,.4f}"),
+        "USD Value":     raw["USD Value"].map(fmt_usd),
+    })
+
+    groups  = raw.groupby(["Protocol", "Classification"], dropna=False, sort=False)
+    totals  = groups["USD Value"].sum()
+    members = groups.indices                             # (proto, cls) → row positions
+    order   = totals.groupby(level="Protocol").sum().sort_values(ascending=False)
+
+    sections = []
+    for proto in order.index:
+        parts = []
+        for cls in totals.loc[proto].sort_values(ascending=False).index:
+            if pd.isna(cls):            # skip empty classifications
+                continue
+            pos = members[(proto, cls)]
+            if cls == "Liquidity Pool" and proto not in ("Pendle", "Pendle V2"):
+                part = lp_table(raw.iloc[pos].sort_index())   # API row order for "first"
+                part["USD Value"] = part["USD Value"].apply(fmt_usd)
+            else:
+                part = shown.iloc[pos]
+            parts.append((cls, part[TABLE_COLS]))
+        sections.append((proto, order[proto], parts))
+    return sections
+
+@timing.timed("wallet snapshot")
+def load_wallet_snapshot(sheet: str, day: datetime.date) -> pd.DataFrame:
+    """Latest balances snapshot of ``day`` from the local mirror (see store.py)."""
+    book = st.secrets["sheet_id"]
+    try:
+        if store.sync_due(book, sheet):
+            store.sync(_sheet().worksheet(sheet), "wallet_balances")
+    except Exception:
+        pass
+    try:
+        return store.read_wallet_snapshot(book, sheet, day)
+    except Exception:
+        return pd.DataFrame(columns=[
+            "Wallet", "Chain", "Token",
+            "Token Balance", "USD Value", "date"
+        ])
+
+# ───────── Debank per-chain helpers ──────────
+# a wallet's data is cached per (wallet, chain), and only the chains picked
+# in the sidebar that the wallet has actually used (debank.active_chains,
+# refreshed daily) are fetched – switching chains on or off never refetches
+# the others.  Responses live in
+# debank.RESPONSES: a stale entry is served at once and refreshed in the
+# background, only expired / unknown pairs block the render, and a failed
+# pair is remembered (shown empty) for debank.SWR_ERROR_TTL before it is retried.
+@timing.timed("debank chains")
+def wallet_chains(wallets: list[str], chain_ids: list[str], max_in_flight: int) -> list[tuple[str, str]]:
+    """(wallet, chain) pairs worth fetching: ``chain_ids`` narrowed to each wallet's active chains."""
+    try:
+        active = debank.active_chains(wallets, _headers(), max_in_flight)
+    except Exception as e:
+        st.warning(f"⚠️ Active-chain index unavailable ({e}) – fetching every selected chain.")
+        active = {}
+    return [(w, c) for w in wallets for c in chain_ids
+            if active.get(w) is None or c in active[w]]
+
+
+@timing.timed("debank tokens", cached=True)
+def debank_tokens(pair: tuple[str, str]) -> list[dict]:
+    wallet, chain = pair
+    headers = _headers()
+
+    def fetch():
+        timing.miss("debank tokens")
+        return token_rows(wallet, debank.token_list(wallet, chain, headers), CHAIN_NAMES)
+    try:
+        return debank.RESPONSES.get(("token_list", wallet, chain), fetch)[0]
+    except debank.DebankError as e:
+        st.warning(str(e))
+        return []
+    except RequestException as e:                       # timeout / connection error
+        st.warning(f"⚠️ Debank {wallet[:6]}…{wallet[-4:]} {chain}: {e}")
+        return []
+
+
+@timing.timed("debank protocols", cached=True)
+def debank_protocols(pair: tuple[str, str]) -> list[dict]:
+    wallet, chain = pair
+    headers = _headers()
+
+    def fetch():
+        timing.miss("debank protocols")
+        return debank.complex_protocol_list(wallet, chain, headers)
+    try:
+        return debank.RESPONSES.get(("complex_protocol_list", wallet, chain), fetch)[0]
+    except debank.DebankError as e:
+        st.warning(str(e))
+        return []
+    except RequestException as e:                       # timeout / connection error
+        st.warning(f"⚠️ Debank {wallet[:6]}…{wallet[-4:]} {chain}: {e}")
+        return []
+
+
+def fetch_debank(wallets: list[str], chain_ids: list[str], max_in_flight: int):
+    """
+    ``(pairs, token_rows, protocol_payloads)`` for every (wallet, chain)
+    worth fetching; token + protocol calls go out together (cache hits are free).
+    """
+    pairs = wallet_chains(wallets, chain_ids, max_in_flight)
+    return (pairs, *fetch_wallets(pairs, debank_tokens, debank_protocols, max_in_flight=max_in_flight))
+
+
+def debank_frames(pairs: list[tuple[str, str]], tok_lists: list[list[dict]],
+                  prot_lists: list[list[dict]]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """``fetch_debank`` output → (wallet frame, protocol frame)."""
+    return wallet_frame(tok_lists), protocol_frame([w for w, _ in pairs], prot_lists, CHAIN_NAMES)
+
+
+def debank_fetched_at(pairs: list[tuple[str, str]]) -> datetime.datetime:
+    """When the oldest Debank response behind the (wallet, chain) ``pairs`` was fetched (UTC)."""
+    stamps = [debank.RESPONSES.stamp((ep, w, c)) for w, c in pairs
+              for ep in ("token_list", "complex_protocol_list")]
+    stamps = [s for s in stamps if s is not None]
+    return datetime.datetime.fromtimestamp(min(stamps) if stamps else time.time(),
+                                           datetime.timezone.utc)
+
+def _headers() -> dict:
+    return {"AccessKey": st.secrets["ACCESS_KEY"]}
+
+
+# ───────────── off-chain sheet fetcher ─────────────
+@timing.timed("offchain")
+def fetch_offchain(conf: dict, sheet: str) -> pd.DataFrame:
+    """
+    The tenant's off-chain sheet has:
+      wallet_address | blockchain | token_symbol | token_balance | protocol
+    Convert it to the same shape as df_protocols.
+    """
+    try:
+        values, err = conf[sheet]
+        if err:
+            raise RuntimeError(err)
+        records = sheets.records(values)
+        if not records:
+            return pd.DataFrame(columns=COLS_PROTO)          # placeholder
+        return offchain_frame(records, dune_prices())      # live prices from Dune
+    except Exception as e:
+        st.warning(f"⚠️ Off-chain sheet fetch failed ({e}) – skipping.")
+        return pd.DataFrame(columns=COLS_PROTO)
+
+# ───────────── hourly snapshot ─────────────
+def write_snapshot(cfg: dict, df_wallets: pd.DataFrame, df_protocols: pd.DataFrame,
+                   cats: dict[str, str]):
+    if df_protocols.empty and df_wallets.empty: return    # nothing to write – don't open the book
+    write_history_snapshot(_sheet(), cfg, df_wallets, df_protocols, cats)
+
+@timing.timed("write_snapshot", cached=True)
+@st.cache_data(ttl=3600,show_spinner=False)
+def _hourly(name: str, _df_wallets, _df_protocols, _cats):
+    timing.miss("write_snapshot")
+    write_snapshot(TENANTS[name], _df_wallets, _df_protocols, _cats); return True
+
+# ───────────── history ─────────────
+@timing.timed("history")
+def load_history(sheet: str):
+    """
+    History from the local SQLite mirror (store.py), topped up with the rows
+    appended to the worksheet since the last sync.  If Sheets is unreachable
+    the local copy is shown as-is.
+    """
+    book = st.secrets["sheet_id"]
+    try:
+        if store.sync_due(book, sheet):
+            store.sync(_sheet().worksheet(sheet), "history")
+    except Exception:
+        pass
+    try:
+        return store.read_history(book, sheet)
+    except Exception: return pd.DataFrame(columns=["timestamp","history_type","name","usd_value"])
+
+
+# ───────────── page ─────────────
+def snapshot_max_age() -> datetime.timedelta:
+    return datetime.timedelta(minutes=int(st.secrets.get("SNAPSHOT_MAX_AGE_MIN", 30)))
+
+def render(name: str, pick_tenant: bool = False):
+    """
+    Draw the full dashboard for tenant ``name``.  With ``pick_tenant`` a
+    sidebar selector switches tenants through the ``?tenant=`` query param.
+    """
+    run = timing.start(name)
+    try:
+        _render(name, pick_tenant, run)
+    finally:
+        # also on st.rerun() / an exception: the run is always logged and dropped
+        stats = timing.finish()
+    if st.query_params.get("debug") == "timings" or st.secrets.get("DEBUG_TIMINGS", False):
+        with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+            st.caption(f"Run total: {stats['total_s']:.2f}s")
+            tbl = (pd.DataFrame.from_dict(stats["stages"], orient="index")
+                     .rename_axis("stage").reset_index().fillna("–"))
+            st.markdown(md_table(tbl, ["stage", "calls", "hits", "misses", "seconds"]))
+
+def _render(name: str, pick_tenant: bool, run: timing.Run):
+    cfg     = TENANTS[name]
+    chains  = chain_names(name)
+    palette = {**COLOR_JSON, **cfg["colors"]}
+
+    st.set_page_config(page_title=cfg["title"], layout="wide")
+    if pick_tenant:
+        choice = st.sidebar.selectbox("Dashboard", list(TENANTS), index=list(TENANTS).index(name),
+                                      format_func=lambda t: TENANTS[t]["title"])
+        if choice != name:
+            st.query_params["tenant"] = choice
+            st.rerun()
+    st.title(f"📊 {cfg['title']}")
+    st.markdown(TABLE_CSS, unsafe_allow_html=True)
+
+    conf       = load_config_sheets(cfg["addresses"], cfg["offchain"])   # one Sheets round-trip
+    token_cats = load_token_categories(conf)
+    run.lap("config")
+
+    # ───────────── sidebar ─────────────
+    sel_wallets = load_wallets(conf, cfg["addresses"])
+    sel_chains  = st.sidebar.multiselect("Chains",  list(chains.values()), default=list(chains.values()))
+
+    # ───────────── build dfs ─────────────
+    # a fresh snapshot from collector.py wins; otherwise fetch live
+    snap = read_portfolio_snapshot(name, max_age=snapshot_max_age())
+    if snap is not None:
+        df_wallets, df_protocols = snap["wallets"], snap["protocols"]
+        fetched_at = snap["fetched_at"]
+        for w in snap.get("failed", []):        # older snapshots have no "failed"
+            st.warning(f"⚠️ Debank {w[:6]}…{w[-4:]}: fetch failed in the last collector pass – "
+                       "wallet missing from this page.")
+    else:
+        pairs, tok_lists, prot_lists = fetch_debank(
+            sel_wallets, [c for c, n in chains.items() if n in sel_chains],
+            int(st.secrets.get("DEBANK_MAX_IN_FLIGHT", 8)))
+        df_wallets, df_protocols = debank_frames(pairs, tok_lists, prot_lists)
+        fetched_at = debank_fetched_at(pairs)
+
+    # chain filter, drop rows < $1, append off-chain balances
+    df_offchain = snap["offchain"] if snap is not None else fetch_offchain(conf, cfg["offchain"])
+    prices_at   = snap.get("prices_at") if snap is not None else dune_prices_fetched_at()
+    df_wallets, df_protocols = filter_frames(df_wallets, df_protocols, sel_chains, df_offchain)
+    run.lap("frames")
+
+    # ───────────── hourly snapshot ─────────────
+    # a fresh collector snapshot means collector.py is running and writes the hour itself
+    if snap is None:
+        _hourly(name, df_wallets, df_protocols, token_cats)
+    run.lap("snapshot")
+
+    # ───────────── counters ─────────────
+    tot_val  = df_wallets["USD Value"].sum()+df_protocols["USD Value"].sum()
+    tot_defi = df_protocols["USD Value"].sum()
+    tot_wal  = df_wallets["USD Value"].sum()
+    last_ts  = fetched_at.strftime("%Y-%m-%d %H:%M UTC")
+
+    cA,cB,cC,cD = st.columns(4)
+    cA.metric("📦 Total Value",  fmt_usd(tot_val))
+    cB.metric("🏦 DeFi Protocols",  fmt_usd(tot_defi))
+    cC.metric("💰 Wallet Balances", fmt_usd(tot_wal))
+    elapsed = (datetime.datetime.now(datetime.timezone.utc) - fetched_at).total_seconds()
+    readable = "just now" if elapsed < 60 else f"{int(elapsed//60)} min ago" if elapsed < 3600 else f"{int(elapsed//3600)} hr ago"
+    cD.metric("⏱️ Updated", readable,
+              help=f"Oldest on-chain data on this page was fetched {last_ts}.")
+
+    # ───────────── breakdown pies ─────────────
+    st.markdown(f"## 🔍 {cfg['breakdown']}")
+    pie1_col, pie2_col = st.columns(2)
+
+    # ---------- chain pie ----------
+    chain_sum = chain_totals(df_wallets, df_protocols)
+
+    if not chain_sum.empty:
+        chain_df = chain_sum.reset_index()
+        chain_df.columns = ["chain", "usd"]          # ← robust rename
+        fig_chain = px.pie(
+            chain_df,
+            names="chain",
+            values="usd",
+            hole=.4,
+            color_discrete_sequence=[palette.get(c, "#ccc") for c in chain_df["chain"]]
+        )
+        fig_chain.update_traces(
+            texttemplate="%{label}<br>%{percent}<br>%{customdata}",
+            customdata=[fmt_usd(v) for v in chain_df["usd"]],
+            hovertemplate="chain = %{label}<br>value = %{customdata}<extra></extra>"
+        )
+        fig_chain.update_layout(title_text="By Chain")
+        pie1_col.plotly_chart(fig_chain, use_container_width=True)
+
+    # ---------- protocol pie ----------
+    if not df_protocols.empty or not df_wallets.empty:
+        proto_sum = protocol_totals(df_wallets, df_protocols)
+        top5 = proto_sum.head(5)
+        if proto_sum.size > 5:
+            top5.loc["Others"] = proto_sum.iloc[5:].sum()
+        proto_df = top5.reset_index()
+        proto_df.columns = ["protocol", "usd"]       
+        present = proto_df["protocol"].tolist()
+        colour_map = {p: palette[p]          
+                        for p in present
+                        if p in palette}
+        fallback_cycle = itertools.cycle(px.colors.qualitative.Plotly)
+        for p in present:
+            if p not in colour_map:
+                colour_map[p] = next(fallback_cycle)
+        fig_proto = px.pie(
+            proto_df,
+            names="protocol",
+            values="usd",
+            color="protocol",
+            hole=.4,
+            color_discrete_map=colour_map,
+        )
+        fig_proto.update_traces(
+            texttemplate="%{label}<br>%{percent}<br>%{customdata}",
+            customdata=[fmt_usd(v) for v in proto_df["usd"]],
+            hovertemplate="protocol = %{label}<br>value = %{customdata}<extra></extra>"
+        )
+        fig_proto.update_layout(title_text="By DeFi Protocols")
+        pie2_col.plotly_chart(fig_proto, use_container_width=True)
+
+    st.markdown("---")
+    run.lap("breakdown charts")
+
+    # ───────────── history area charts ─────────────
+    hist = load_history(cfg["history"])
+
+    # ── NEW: keep only the *latest* snapshot of every day ──────────────
+    if not hist.empty:
+        hist_day = (hist.sort_values("timestamp")                         # oldest→newest
+                        .assign(day=lambda d: d["timestamp"].dt.normalize())
+                        .groupby(["history_type", "name", "day"], as_index=False)
+                        .last())                                          # row with latest hour
+    else:
+        hist_day = hist
+
+    st.markdown("## 📈 Historical Data")
+    area1,area2=st.columns(2)
+
+    if not hist.empty:
+        # protocol area
+        p = (hist_day[hist_day["history_type"] == "protocol"]
+            .sort_values("day")              
+            .copy())
+        if not p.empty:
+            p["usd_value"]=pd.to_numeric(p["usd_value"],errors="coerce").fillna(0)
+            top=p.groupby("name")["usd_value"].last().nlargest(10).index
+            p.loc[~p["name"].isin(top),"name"]="Others"
+            p = (p.groupby(["day", "name"], as_index=False)    
+                   .agg({"usd_value": "sum"})) 
+            fig_p = px.area(
+                p, x="day", y="usd_value", color="name",
+                color_discrete_map=palette                          
+            )
+            fig_p.update_layout(title="Top Protocols",xaxis_title="Date",yaxis_title="")
+            fig_p.update_yaxes(tickformat="$~s")
+            fig_p.update_xaxes(tickformat="%b %d %Y")
+            area1.plotly_chart(fig_p,use_container_width=True)
+
+        # token area
+        t = (hist_day[hist_day["history_type"] == "token"]
+            .sort_values("day")             
+            .copy())
+        if not t.empty:
+            t["usd_value"]=pd.to_numeric(t["usd_value"],errors="coerce").fillna(0)
+            cats=["ETH","Stables","Others"]
+            t.loc[~t["name"].isin(cats),"name"]="Others"
+            fig_t = px.area(
+                t, x="day", y="usd_value", color="name",
+                color_discrete_map=palette                          
+            )
+            fig_t.update_layout(title="Token Categories",xaxis_title="Date",yaxis_title="")
+            fig_t.update_yaxes(tickformat="$~s")
+            fig_t.update_xaxes(tickformat="%b %d %Y")
+            area2.plotly_chart(fig_t,use_container_width=True)
+
+    # ───────────── rewards (vault tenants) ─────────────
+    if cfg["rewards"]:
+        st.markdown(f"## 🧃 {cfg['rewards']['title']}")
+
+        rewards_df = dune_rewards(cfg["rewards"]["query_secret"])
+
+        if not rewards_df.empty:
+            # Reuse color palette where possible
+            present = rewards_df["protocol"].unique().tolist()
+            colour_map = {p: palette[p] for p in present if p in palette}
+
+            # 1) Daily rewards per protocol (stacked bar)
+            rew_left, rew_right = st.columns(2)
+
+            daily = (
+                rewards_df
+                .groupby(["day", "protocol"], as_index=False)["rewards_usd"]
+                .sum()
+                .sort_values("day")
+            )
+            fig_rew_bar = px.bar(
+                daily,
+                x="day",
+                y="rewards_usd",
+                color="protocol",
+                barmode="stack",
+                color_discrete_map=colour_map,
+            )
+            fig_rew_bar.update_layout(
+                title="Weekly Rewards by Protocol",
+                xaxis_title="Date",
+                yaxis_title="USD",
+                legend_title="Protocol",
+            )
+            fig_rew_bar.update_yaxes(tickformat="$~s")
+            fig_rew_bar.update_xaxes(tickformat="%b %d %Y")
+            rew_left.plotly_chart(fig_rew_bar, use_container_width=True)
+
+            # 2) Total rewards per protocol (pie)
+            totals = (
+                rewards_df
+                .groupby("protocol", as_index=False)["rewards_usd"]
+                .sum()
+                .sort_values("rewards_usd", ascending=False)
+            )
+            fig_rew_pie = px.pie(
+                totals,
+                names="protocol",
+                values="rewards_usd",
+                color="protocol",
+                color_discrete_map=colour_map,
+                hole=.35,
+            )
+            fig_rew_pie.update_traces(
+                texttemplate="%{label}<br>%{percent}<br>%{customdata}",
+                customdata=[fmt_usd(v) for v in totals["rewards_usd"]],
+                hovertemplate="protocol = %{label}<br>value = %{customdata}<extra></extra>",
+            )
+            fig_rew_pie.update_layout(title="Total Rewards by Protocol")
+            rew_right.plotly_chart(fig_rew_pie, use_container_width=True)
+        else:
+            st.info("No rewards data returned yet.")
+
+
+    st.markdown("---")
+    run.lap("history charts")
+
+    # ───────────── wallet table ─────────────
+    # --- wallet-table filters -----------------------------------
+    col_w, col_t, col_d = st.columns(3)
+
+    with col_w:
+        wallet_input = st.text_input(
+            "👛 Wallet filter",
+            key="wal_filter",
+            placeholder="All Wallets",
+            help="Multiple Addresses are separated by commas, e.g. 0x345…5775, 0x4646…5656"
+        )
+
+    with col_t:
+        token_input = st.text_input(
+            "🪙 Token filter",
+            key="tok_filter",
+            placeholder="All Tokens",
+            help="Multiple Tokens are separated by commas, e.g. weETH, WETH"
+        )
+
+    with col_d:
+        snap_date = st.date_input(
+            "📅 Snapshot date",
+            datetime.date.today(),
+            help="Pick a past date to load the latest snapshot for that day. Today = live data."
+        )
+
+    filter_wallets = [w.strip().lower() for w in wallet_input.split(",") if w.strip()]
+    filter_tokens = [t.strip().upper() for t in token_input.split(",") if t.strip()]
+
+    # dataframe view after applying the two filters
+    df_wallets_view = df_wallets.copy()
+    if filter_wallets:
+        df_wallets_view = df_wallets_view[df_wallets_view["Wallet"].str.lower().isin(filter_wallets)]
+    if filter_tokens:
+        df_wallets_view = df_wallets_view[df_wallets_view["Token"].str.upper().isin(filter_tokens)]
+
+    st.subheader("💰 Wallet Balances")
+    if not df_wallets_view.empty:
+        live_df   = df_wallets.copy()
+        hist_df   = load_wallet_snapshot(cfg["wallet_balances"], snap_date) if snap_date != datetime.date.today() else pd.DataFrame()
+        if hist_df.empty and snap_date != datetime.date.today():
+            st.warning("No snapshot found for that date – showing live data instead.")
+        src_df    = hist_df if not hist_df.empty else live_df
+
+        df_filtered = src_df.copy()
+        if filter_wallets:
+            df_filtered = df_filtered[df_filtered["Wallet"].str.lower().isin(filter_wallets)]
+        if filter_tokens:
+            df_filtered = df_filtered[df_filtered["Token"].str.upper().isin(filter_tokens)]
+
+        if df_filtered.empty:
+            st.info("No wallet balances match the current filters.")
+            st.markdown("---")
+
+        else:
+            df = df_filtered.copy()
+            if "timestamp" in df.columns:
+                df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+                df = (df.sort_values(["Wallet", "Chain", "Token", "timestamp"],
+                                     ascending=[True,   True,    True,     False])
+                        .drop_duplicates(subset=["Wallet", "Chain", "Token"], keep="first"))
+
+
+            # ── server-side sort + pagination: only the visible page is formatted ──
+            c_sort, c_dir, c_size, c_page = st.columns([2, 1, 1, 1])
+            sort_by  = c_sort.selectbox("Sort by", WALLET_SORT_COLS, key="wb_sort")
+            desc     = c_dir.selectbox("Order", ["Descending", "Ascending"], key="wb_dir") == "Descending"
+            per_page = c_size.selectbox("Rows per page", WALLET_PAGE_SIZES, key="wb_size")
+            pages    = max(1, -(-len(df) // per_page))
+            page     = min(int(c_page.number_input(f"Page (of {pages})", min_value=1, step=1,
+                                                   key="wb_page")), pages)
+
+            df = sort_wallets(df, sort_by, desc)
+
+            csv_df = df.rename(
+                columns={
+                    "Wallet":        "full_address",
+                    "Chain":         "blockchain",
+                    "Token":         "token_symbol",
+                    "Token Balance": "token_balance",
+                    "USD Value":     "usd_value",
+                }
+            )
+            csv_df["date"] = snap_date.strftime("%d-%m-%Y")
+            first = (page - 1) * per_page
+            df = wallet_page(df, first, per_page)
+
+            st.markdown(md_table(df, TABLE_COLS, max_rows=None), unsafe_allow_html=True)
+            st.caption(f"Rows {first + 1:,}–{first + len(df):,} of {len(csv_df):,}")
+
+            csv_bytes = csv_df.to_csv(index=False).encode("utf-8")
+            st.download_button("⬇️ Download CSV", csv_bytes,
+                               file_name=f"{cfg['wallet_balances']}.csv",
+                               mime="text/csv")
+
+    else:
+        st.info("No wallet balances match the current filters.")
+
+    st.markdown("---")   # separator before protocol section
+    run.lap("wallet table")
+
+    # ───────────── protocol positions table ─────────────
+    st.subheader("🏦 DeFi Protocol Positions")
+    if not df_offchain.empty and prices_at is not None:
+        st.caption(f"Off-chain balances valued with Dune prices fetched "
+                   f"{prices_at:%Y-%m-%d %H:%M} UTC.")
+    if not df_protocols.empty:
+        for proto, total, parts in protocol_sections(df_protocols):
+            st.markdown(
+                f'<h3><img src="{PROTOCOL_LOGOS.get(proto,"")}" width="24" style="vertical-align:middle;margin-right:6px;">'
+                f'{proto} ({fmt_usd(total)})</h3>', unsafe_allow_html=True)
+            for cls, part in parts:
+                st.markdown(f"<h4 style='margin:6px 0 2px'>{cls}</h4>", unsafe_allow_html=True)
+                st.markdown(md_table(part, TABLE_COLS), unsafe_allow_html=True)
+
+            st.markdown("<hr style='margin:1.5em 0'>", unsafe_allow_html=True)
+
+    else:
+        st.info("No DeFi protocol positions found.")
+    run.lap("protocol tables")
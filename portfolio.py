@@ -0,0 +1,322 @@
+"""
+Portfolio frames shared by the dashboards and the headless collector.
+
+Turns raw Debank payloads and off-chain sheet rows into the wallet /
+protocol tables the dashboards render, and stores ready-to-render
+snapshots on local disk so a page view never has to wait on the APIs.
+The hourly history / wallet-balance rows are appended to the tenant's
+worksheets from here too, by whichever of the collector or a live page
+view produces the frames.
+"""
+import datetime
+import itertools
+import os
+import re
+from functools import lru_cache
+
+import gspread
+import pandas as pd
+
+import sheets
+import store
+
+COLS_WALLET = ["Wallet", "Chain", "Token", "Token Balance", "USD Value"]
+COLS_PROTO  = ["Protocol", "Classification", "Blockchain", "Pool",
+               "Wallet", "Token", "Token Balance", "USD Value"]
+
+ADDR_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")   # exactly 42-char EVM address
+
+# next to this module, so the collector and the app find it whatever their working directory
+SNAPSHOT_DIR = os.environ.get("TREASURY_SNAPSHOT_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots"))
+
+
+# ───────────── sheet parsing ─────────────
+def parse_wallets(raw: list[str]) -> tuple[list[str], list[str]]:
+    """Split raw column values into (well-formed addresses, malformed 0x… rows)."""
+    raw  = [v.strip() for v in raw]
+    good = [a for a in raw if ADDR_RE.fullmatch(a)]
+    bad  = [a for a in raw if a and a.startswith("0x") and not ADDR_RE.fullmatch(a)]
+    return good, bad
+
+
+# ───────────── Debank flattening ─────────────
+def first_symbol(t): return t.get("optimized_symbol") or t.get("display_symbol") or t.get("symbol")
+
+
+def token_rows(wallet: str, tokens: list[dict], chain_names: dict) -> list[dict]:
+    """all_token_list payload → one row per priced token."""
+    rows = []
+    for t in tokens:
+        price, amt = t.get("price", 0), t.get("amount", 0)
+        if price <= 0:
+            continue
+
+        chain_id = t.get("chain") or t.get("chain_id")
+        rows.append({
+            "Wallet":        wallet,
+            "Chain":         chain_names.get(chain_id, chain_id),
+            "Token":         first_symbol(t),
+            "Token Balance": amt,
+            "USD Value":     amt * price,
+        })
+    return rows
+
+
+def wallet_frame(token_lists: list[list[dict]]) -> pd.DataFrame:
+    """Concatenate per-wallet ``token_rows`` output into one frame."""
+    return pd.DataFrame(itertools.chain.from_iterable(token_lists), columns=COLS_WALLET)
+
+
+# token lists of a portfolio item, in row order; the borrow side is negated
+_SIDES = (("supply", "supply_token_list"),
+          ("reward", "reward_token_list"),
+          ("borrow", "borrow_token_list"))
+
+
+def protocol_frame(wallets: list[str], protocol_lists: list[list[dict]],
+                   chain_names: dict) -> pd.DataFrame:
+    """
+    Flatten the per-wallet all_complex_protocol_list payloads into one frame
+    – one row per priced supply / reward / borrow token.
+
+    The walk only appends to column lists: position-level fields are kept
+    once per position and repeated, and a side column replaces the negated
+    borrow dicts; balances and USD values are then computed column-wise.
+    """
+    pos   = {c: [] for c in ("Protocol", "Classification", "Blockchain", "Pool", "Wallet")}
+    count = []                                  # priced tokens per position
+    side, token, amount, price = [], [], [], []
+    for w, protocols in zip(wallets, protocol_lists):
+        for p in protocols:
+            chain = chain_names.get(p.get("chain"), p.get("chain"))
+            for it in p.get("portfolio_item_list", []):
+                detail = it.get("detail") or {}
+                desc   = detail.get("description") or ""
+                label  = desc if desc and not desc.startswith("#") else None
+                n = 0
+                for s, key in _SIDES:
+                    for t in detail.get(key, []):
+                        pr = t.get("price", 0)
+                        if pr <= 0:
+                            continue
+                        side.append(s)
+                        token.append(label or first_symbol(t))
+                        amount.append(t.get("amount", 0))
+                        price.append(pr)
+                        n += 1
+                if n:
+                    count.append(n)
+                    for c, v in zip(pos, (p.get("name"), it.get("name", ""), chain,
+                                          it.get("pool", {}).get("id", ""), w)):
+                        pos[c].append(v)
+
+    if not count:
+        return pd.DataFrame(columns=COLS_PROTO)
+    df = pd.DataFrame({c: pd.Series(v).repeat(count).to_numpy() for c, v in pos.items()})
+    amount = pd.Series(amount)
+    df["Token"]         = token
+    df["Token Balance"] = amount.where(pd.Series(side) != "borrow", -amount)
+    df["USD Value"]     = df["Token Balance"] * pd.Series(price)
+    return df[COLS_PROTO]
+
+
+# ───────────── off-chain balances ─────────────
+def offchain_frame(records: list[dict], prices: dict) -> pd.DataFrame:
+    """
+    Off-chain sheet rows
+      wallet_address | blockchain | token_symbol | token_balance | protocol
+    valued with ``prices`` and shaped like the protocol frame.
+    """
+    df = pd.DataFrame(records)
+    if df.empty:
+        return pd.DataFrame(columns=COLS_PROTO)
+    df["usd_price"]   = df["token_symbol"].map(prices)
+    df["USD Value"]   = pd.to_numeric(df["token_balance"], errors="coerce") * df["usd_price"]
+    df = df.dropna(subset=["USD Value"])                   # drop if no price
+    df = df.rename(columns={
+        "wallet_address": "Wallet",
+        "blockchain":     "Blockchain",
+        "token_symbol":   "Token",
+        "token_balance":  "Token Balance",
+        "protocol":       "Protocol",
+    })
+    df["Classification"] = ""         # leave empty
+    df["Pool"]           = ""         # N/A
+    return df[COLS_PROTO]
+
+
+# ───────────── page frames ─────────────
+def filter_frames(wallets: pd.DataFrame, protocols: pd.DataFrame, chains: list[str],
+                  offchain: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    What a page shows: token and protocol rows on ``chains`` (display
+    names) worth at least $1 (protocol rows by absolute value, so debts
+    stay), with the off-chain rows appended to the protocols.
+    """
+    wallets = wallets[wallets["Chain"].isin(chains)].copy()
+    wallets["USD Value"] = pd.to_numeric(wallets["USD Value"], errors="coerce")
+    wallets = wallets[wallets["USD Value"] >= 1]
+
+    protocols = protocols[protocols["Blockchain"].isin(chains)].copy()
+    protocols["USD Value"] = pd.to_numeric(protocols["USD Value"], errors="coerce")
+    protocols = protocols[abs(protocols["USD Value"]) >= 1]
+    return wallets, pd.concat([protocols, offchain], ignore_index=True)
+
+
+# ───────────── token categories ─────────────
+def token_categories(values: list[list]) -> dict[str, str]:
+    """*token_category* sheet rows (col A = keyword, col B = category) → { keyword_lower : CategoryName }."""
+    rows = [tuple(map(str.strip, (r + ["", ""])[:2]))
+            for r in values if r and r[0].strip()]
+    return {k.lower(): v for k, v in rows if v}
+
+
+@lru_cache(maxsize=8)
+def _category_matcher(rules: tuple[tuple[str, str], ...]):
+    """
+    Compile the keyword rules into one regex.  The zero-width lookahead
+    reports, at every position of a symbol, the earliest-listed keyword
+    starting there; the lowest rank over all positions is the keyword the
+    old "first match in sheet order wins" loop would have returned.
+    """
+    if not rules:
+        return lambda tok: "Others"
+    keywords = [kw for kw, _ in rules]
+    rank     = {kw: i for i, kw in enumerate(keywords)}
+    pattern  = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+
+    @lru_cache(maxsize=4096)                    # symbols repeat across wallets / chains
+    def match(tok: str) -> str:
+        hits = [rank[m.group(1)] for m in pattern.finditer(tok.lower())]
+        return rules[min(hits)][1] if hits else "Others"
+    return match
+
+
+def category_matcher(cats: dict[str, str]):
+    """Token symbol → category (fallback 'Others') for one rule set – build once, then ``.map`` with it."""
+    return _category_matcher(tuple(cats.items()))
+
+
+def category_totals(df_wallets: pd.DataFrame, df_protocols: pd.DataFrame,
+                    cats: dict[str, str]) -> pd.Series:
+    """USD value per token category over wallet and protocol rows."""
+    combined = pd.concat([df_wallets[["Token", "USD Value"]],
+                          df_protocols[["Token", "USD Value"]]], ignore_index=True)
+    return (combined.assign(cat=combined["Token"].map(category_matcher(cats)))
+                    .groupby("cat")["USD Value"].sum())
+
+
+# ───────────── hourly history snapshot ─────────────
+_last_hour: dict[str, str] = {}     # history sheet → last hour this process saw written
+
+def write_history_snapshot(sh: gspread.Spreadsheet, cfg: dict, df_wallets: pd.DataFrame,
+                           df_protocols: pd.DataFrame, cats: dict[str, str]):
+    """
+    Append this hour's protocol / token-category totals to the tenant's
+    history sheet and its wallet rows to the wallet_balances sheet, unless
+    the hour is already there; then pull both into the local mirror.
+    """
+    if df_protocols.empty and df_wallets.empty: return
+    hour=datetime.datetime.utcnow().replace(minute=0,second=0,microsecond=0).isoformat()
+    if _last_hour.get(cfg["history"])==hour: return     # already written by this process
+    try: ws=sh.worksheet(cfg["history"])
+    except gspread.WorksheetNotFound:
+        ws=sh.add_worksheet(cfg["history"],rows=2,cols=4)
+        ws.append_row(["timestamp","history_type","name","usd_value"])
+
+    last=sheets.last_row(ws) if ws.row_count>1 else []
+    if last and last[0]==hour:
+        _last_hour[cfg["history"]]=hour; return
+
+    rows=[[hour,"protocol",p,round(v,2)]
+          for p,v in df_protocols.groupby("Protocol")["USD Value"].sum().items()]
+
+    rows += [[hour,"token",c,round(v,2)] for c,v in category_totals(df_wallets,df_protocols,cats).items()]
+    rows.append([hour, "protocol", "Wallet Balances",
+             round(df_wallets["USD Value"].sum(), 2)])
+    # ─── snapshot wallet balances ───────────────────────────────
+    try:
+        wb_ws = sh.worksheet(cfg["wallet_balances"])
+    except gspread.WorksheetNotFound:
+        wb_ws = sh.add_worksheet(cfg["wallet_balances"], rows=2, cols=6)
+        wb_ws.append_row(
+            ["full_address", "blockchain", "token_symbol",
+             "token_balance", "usd_value", "date", "timestamp"]
+        )
+
+    timestamp_iso = datetime.datetime.utcnow().isoformat(timespec="seconds")
+    date_str      = datetime.datetime.utcnow().strftime("%d-%m-%Y")
+    
+    wb_rows = (
+        df_wallets.assign(date=date_str, timestamp=timestamp_iso)   # ⬅️ add both cols
+                  .rename(columns={
+                      "Wallet":        "full_address",
+                      "Chain":         "blockchain",
+                      "Token":         "token_symbol",
+                      "Token Balance": "token_balance",
+                      "USD Value":     "usd_value",
+                  })
+                  [["full_address", "blockchain", "token_symbol",
+                    "token_balance", "usd_value", "date", "timestamp"]]
+                  .values.tolist()
+    )
+    wb_ws.append_rows(wb_rows, value_input_option="RAW")
+    ws.append_rows(rows,value_input_option="RAW")
+    _last_hour[cfg["history"]]=hour
+    for w, table in ((ws, "history"), (wb_ws, "wallet_balances")):
+        try: store.sync(w, table, force=True)        # pull the rows we just wrote into the mirror
+        except Exception: pass
+
+
+# ───────────── local snapshots ─────────────
+def _snapshot_path(name: str, root: str) -> str:
+    return os.path.join(root, f"{name}.pkl")
+
+
+def write_portfolio_snapshot(name: str, wallets: pd.DataFrame, protocols: pd.DataFrame,
+                             offchain: pd.DataFrame, root: str = SNAPSHOT_DIR,
+                             fetched_at: datetime.datetime | None = None,
+                             failed: list[str] | None = None, prices: dict | None = None,
+                             prices_at: datetime.datetime | None = None) -> str:
+    """
+    Persist the un-filtered frames of one dashboard; ``failed`` lists the
+    wallets whose Debank fetch failed (they are missing from the frames),
+    ``prices`` / ``prices_at`` are the Dune prices the off-chain rows were
+    valued with and when they were fetched.  The file is written
+    next to its final path and swapped in with ``os.replace`` so readers
+    never see a half-written snapshot.
+    """
+    os.makedirs(root, exist_ok=True)
+    path = _snapshot_path(name, root)
+    snap = {
+        "fetched_at": fetched_at or datetime.datetime.now(datetime.timezone.utc),
+        "wallets":    wallets,
+        "protocols":  protocols,
+        "offchain":   offchain,
+        "failed":     list(failed or []),
+        "prices":     dict(prices or {}),
+        "prices_at":  prices_at,
+    }
+    tmp = f"{path}.tmp{os.getpid()}"
+    pd.to_pickle(snap, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def read_portfolio_snapshot(name: str, max_age: datetime.timedelta | None = None,
+                            root: str = SNAPSHOT_DIR) -> dict | None:
+    """
+    Return ``{"fetched_at", "wallets", "protocols", "offchain", "failed",
+    "prices", "prices_at"}`` or None
+    when there is no snapshot, it can't be read, or it is older than
+    ``max_age``.
+    """
+    try:
+        snap = pd.read_pickle(_snapshot_path(name, root))
+    except Exception:
+        return None
+    age = datetime.datetime.now(datetime.timezone.utc) - snap["fetched_at"]
+    if max_age is not None and age > max_age:
+        return None
+    return snap
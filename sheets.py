@@ -0,0 +1,94 @@
+"""
+Google-Sheets access shared by the engine and the collector.
+
+One authorized gspread client and one handle per spreadsheet live for the
+whole process, so every worksheet open reuses the same HTTP session (and
+its connection pool) instead of re-running the service-account token
+exchange and the ``open_by_key`` metadata fetch.  The client's
+``AuthorizedSession`` refreshes the access token by itself once it expires.
+"""
+import threading
+
+import gspread
+from gspread.utils import numericise_all
+from google.oauth2.service_account import Credentials
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+_lock   = threading.Lock()
+_client = None          # gspread.Client
+_books  = {}            # spreadsheet key → gspread.Spreadsheet
+
+
+def client(sa_info: dict) -> gspread.Client:
+    """The process-wide client, authorized on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            creds   = Credentials.from_service_account_info(sa_info, scopes=SCOPES)
+            _client = gspread.authorize(creds)
+        return _client
+
+
+def spreadsheet(sa_info: dict, key: str) -> gspread.Spreadsheet:
+    """Cached ``open_by_key`` handle; a failed open is not cached."""
+    sh = _books.get(key)
+    if sh is None:
+        sh = client(sa_info).open_by_key(key)
+        with _lock:
+            sh = _books.setdefault(key, sh)
+    return sh
+
+
+
+# ───────────── bulk reads ─────────────
+def a1(title: str, cols: str | None = None) -> str:
+    """A1 range for a worksheet (whole sheet, or e.g. ``cols="A:B"``)."""
+    name = "'" + title.replace("'", "''") + "'"
+    return f"{name}!{cols}" if cols else name
+
+
+def batch_get(sh: gspread.Spreadsheet, ranges: list[str]) -> tuple[list[list[list]], list[str | None]]:
+    """
+    Read every range with a single ``values:batchGet`` request.
+
+    Returns ``(values, errors)`` – one entry per range, in order.  One bad
+    range (e.g. a missing worksheet) fails the whole batch, so on error the
+    ranges are retried one by one and only the broken ones carry an error.
+    """
+    try:
+        resp = sh.values_batch_get(ranges)
+    except Exception as e:
+        if len(ranges) == 1:
+            return [[]], [str(e)]
+        singles = [batch_get(sh, [r]) for r in ranges]
+        return [v[0] for v, _ in singles], [err[0] for _, err in singles]
+    return [vr.get("values", []) for vr in resp.get("valueRanges", [])], [None] * len(ranges)
+
+
+def records(values: list[list]) -> list[dict]:
+    """``Worksheet.get_all_records()`` over already-fetched values (header row first)."""
+    if not values:
+        return []
+    keys = values[0]
+    pad  = [""] * len(keys)
+    return [dict(zip(keys, numericise_all((row + pad)[:len(keys)], default_blank="")))
+            for row in values[1:]]
+
+
+def last_row(ws: gspread.Worksheet, cols: str = "A:D", window: int = 32) -> list:
+    """
+    Last non-empty row of ``ws`` (restricted to ``cols``) without
+    downloading the sheet: reads a bounded window at the bottom of the grid
+    and only walks further up – in growing steps – when that window is
+    blank padding.
+    """
+    first, last = cols.split(":")
+    end = ws.row_count
+    while end >= 1:
+        start = max(1, end - window + 1)
+        rows  = [r for r in ws.get(f"{first}{start}:{last}{end}") if any(r)]
+        if rows:
+            return rows[-1]
+        end, window = start - 1, window * 4
+    return []
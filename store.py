@@ -0,0 +1,306 @@
+"""
+Local SQLite mirrors of the append-only worksheets and the Dune rewards.
+
+The history and wallet-balance worksheets only ever grow at the bottom, so
+instead of re-downloading them on every rerun we keep a typed copy on disk
+and pull just the rows appended since the last sync.  Reads are then a
+local, indexed query no matter how many years of hourly rows exist.
+Dune rewards are accumulated the same way, keyed by (day, protocol), and
+each wallet's Debank active-chain list is kept here between refreshes.
+"""
+import contextlib
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+import gspread
+import pandas as pd
+
+# next to this module, so the collector and the app share it whatever their working directory
+MIRROR_DB  = os.environ.get("TREASURY_MIRROR_DB",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "sheets_mirror.sqlite"))
+SYNC_EVERY = 300                     # seconds between Sheets syncs of one worksheet
+
+HISTORY_COLS = ["timestamp", "history_type", "name", "usd_value"]
+BALANCE_COLS = ["Wallet", "Chain", "Token", "Token Balance", "USD Value", "date", "timestamp"]
+
+_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    book      TEXT NOT NULL,
+    sheet     TEXT NOT NULL,
+    rows      INTEGER NOT NULL,          -- sheet rows mirrored so far (header included)
+    last_row  TEXT NOT NULL,             -- repr of the last mirrored row, to detect edits
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (book, sheet)
+);
+CREATE TABLE IF NOT EXISTS history (
+    book         TEXT NOT NULL,
+    sheet        TEXT NOT NULL,
+    ts           INTEGER NOT NULL,       -- UTC epoch seconds
+    history_type TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    usd_value    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_by_sheet ON history (book, sheet, ts);
+CREATE TABLE IF NOT EXISTS wallet_balances (
+    book          TEXT NOT NULL,
+    sheet         TEXT NOT NULL,
+    day           TEXT NOT NULL,         -- ISO date of the snapshot
+    ts            INTEGER NOT NULL,      -- UTC epoch seconds
+    wallet        TEXT NOT NULL,
+    chain         TEXT NOT NULL,
+    token         TEXT NOT NULL,
+    token_balance REAL,
+    usd_value     REAL
+);
+CREATE INDEX IF NOT EXISTS wallet_balances_by_day ON wallet_balances (book, sheet, day, ts);
+CREATE TABLE IF NOT EXISTS rewards (
+    query_id    TEXT NOT NULL,
+    day         INTEGER NOT NULL,        -- UTC epoch seconds
+    protocol    TEXT NOT NULL,
+    rewards_usd REAL NOT NULL,
+    PRIMARY KEY (query_id, day, protocol)
+);
+CREATE TABLE IF NOT EXISTS rewards_sync (
+    query_id  TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS active_chains (
+    wallet    TEXT PRIMARY KEY,          -- lower-case address
+    chains    TEXT NOT NULL,             -- comma-separated Debank chain ids
+    synced_at REAL NOT NULL
+);
+"""
+
+
+@contextlib.contextmanager
+def _db(path: str):
+    """Connection with the schema in place; the block runs as one transaction."""
+    con = sqlite3.connect(path, timeout=30)
+    try:
+        con.executescript(_SCHEMA)
+        with con:
+            yield con
+    finally:
+        con.close()
+
+
+def _state(con, book: str, sheet: str):
+    return con.execute("SELECT rows, last_row, synced_at FROM sync_state WHERE book=? AND sheet=?",
+                       (book, sheet)).fetchone()
+
+
+def sync_due(book: str, sheet: str, path: str = MIRROR_DB) -> bool:
+    """True when the mirror of ``sheet`` is older than ``SYNC_EVERY``."""
+    with _db(path) as con:
+        state = _state(con, book, sheet)
+    return not state or time.time() - state[2] >= SYNC_EVERY
+
+
+def _history_records(book: str, sheet: str, rows: list[list]) -> list[tuple]:
+    """Typed (book, sheet, ts, type, name, usd) tuples; blank / unparseable rows are skipped."""
+    df  = pd.DataFrame([(list(r) + [None] * 4)[:4] for r in rows], columns=HISTORY_COLS)
+    ts  = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    usd = pd.to_numeric(df["usd_value"], errors="coerce")
+    ok  = ts.notna() & usd.notna()
+    return [(book, sheet, t, k, n, v) for t, k, n, v in zip(
+        (ts[ok].astype("int64") // 10**9).tolist(),
+        df.loc[ok, "history_type"].astype(str).tolist(),
+        df.loc[ok, "name"].astype(str).tolist(),
+        usd[ok].astype(float).tolist(),
+    )]
+
+
+def _balance_records(book: str, sheet: str, rows: list[list]) -> list[tuple]:
+    """Typed wallet_balances tuples; rows without a parseable date / timestamp are skipped."""
+    df  = pd.DataFrame([(list(r) + [None] * 7)[:7] for r in rows],
+                       columns=["wallet", "chain", "token", "bal", "usd", "date", "ts"])
+    day = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
+    ts  = pd.to_datetime(df["ts"], utc=True, errors="coerce")
+    ok  = day.notna() & ts.notna()
+    num = lambda c: [None if pd.isna(v) else float(v) for v in pd.to_numeric(df.loc[ok, c], errors="coerce")]
+    return list(zip(
+        [book] * int(ok.sum()), [sheet] * int(ok.sum()),
+        day[ok].dt.strftime("%Y-%m-%d").tolist(),
+        (ts[ok].astype("int64") // 10**9).tolist(),
+        *(df.loc[ok, c].astype(str).tolist() for c in ("wallet", "chain", "token")),
+        num("bal"), num("usd"),
+    ))
+
+
+# mirrored table → (last sheet column, first header cell, row parser)
+_TABLES = {
+    "history":         ("D", "timestamp",    _history_records),
+    "wallet_balances": ("G", "full_address", _balance_records),
+}
+
+
+def _read(ws: gspread.Worksheet, start: int, last_col: str) -> list[list]:
+    rows = ws.get(f"A{start}:{last_col}{max(ws.row_count, start)}")
+    return [list(r) for r in rows]          # trailing blank rows are already trimmed
+
+
+def sync(ws: gspread.Worksheet, table: str, path: str = MIRROR_DB, force: bool = False) -> int:
+    """
+    Bring the local ``table`` mirror of ``ws`` up to date; returns the
+    number of rows added.  At most once per ``SYNC_EVERY`` seconds unless
+    ``force``.
+
+    Only the rows from the last mirrored one down are read.  Its first row must
+    still equal the last row we mirrored – if it doesn't (rows deleted,
+    sorted or the sheet cleared) the mirror of that sheet is rebuilt from
+    scratch.  In-place edits of older rows are not noticed.
+
+    The Sheets read happens outside any lock; the write then re-checks
+    that nobody else synced the sheet in the meantime (and starts over
+    from their state if they did).
+    """
+    last_col, header, parse = _TABLES[table]
+    book, sheet = ws.spreadsheet.id, ws.title
+    for _ in range(3):
+        with _db(path) as con:
+            state = _state(con, book, sheet)
+        if state and not force and time.time() - state[2] < SYNC_EVERY:
+            return 0
+
+        done, last = (state[0], state[1]) if state else (0, "")
+        rows = _read(ws, done, last_col) if 0 < done <= ws.row_count else []
+        rebuild = not (rows and repr(rows[0]) == last)
+        if rebuild:
+            rows  = _read(ws, 1, last_col)
+            new   = rows[1:] if rows and rows[0][:1] == [header] else rows
+            total = len(rows)
+            last  = ""
+        else:
+            new, total = rows[1:], done + len(rows) - 1
+        added = parse(book, sheet, new)
+
+        with _lock, _db(path) as con:
+            con.execute("BEGIN IMMEDIATE")       # one writing process at a time
+            now = _state(con, book, sheet)
+            if (now and now[:2]) != (state and state[:2]):
+                continue                         # synced by someone else while we read
+            if rebuild:
+                con.execute(f"DELETE FROM {table} WHERE book=? AND sheet=?", (book, sheet))
+            if added:
+                con.executemany(f"INSERT INTO {table} VALUES ({','.join('?' * len(added[0]))})", added)
+            con.execute("INSERT OR REPLACE INTO sync_state VALUES (?,?,?,?,?)",
+                        (book, sheet, total, repr(rows[-1]) if rows else last, time.time()))
+            return len(added)
+    return 0
+
+
+def read_history(book: str, sheet: str, since: datetime.datetime | None = None,
+                 path: str = MIRROR_DB) -> pd.DataFrame:
+    """History rows as a typed frame: UTC timestamp, history_type, name, usd_value."""
+    q, args = "SELECT ts, history_type, name, usd_value FROM history WHERE book=? AND sheet=?", [book, sheet]
+    if since is not None:
+        q += " AND ts >= ?"
+        args.append(int(since.timestamp()))
+    with _db(path) as con:
+        df = pd.read_sql_query(q + " ORDER BY ts", con, params=args)
+    df["timestamp"] = pd.to_datetime(df.pop("ts"), unit="s", utc=True)
+    return df[HISTORY_COLS]
+
+
+def read_wallet_snapshot(book: str, sheet: str, day: datetime.date,
+                         path: str = MIRROR_DB) -> pd.DataFrame:
+    """
+    The last wallet-balance snapshot taken on ``day`` – one row per
+    (Wallet, Chain, Token).  Only that day's slice of the index is touched.
+    """
+    q = """SELECT wallet, chain, token, token_balance, usd_value, day, ts
+             FROM wallet_balances
+            WHERE book=? AND sheet=? AND day=?
+              AND ts = (SELECT MAX(ts) FROM wallet_balances WHERE book=? AND sheet=? AND day=?)"""
+    key = (book, sheet, day.isoformat())
+    with _db(path) as con:
+        df = pd.read_sql_query(q, con, params=key + key)
+    df.columns = BALANCE_COLS
+    df["date"]      = pd.to_datetime(df["date"]).dt.date
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")      # naive UTC, as written
+    return (df.drop_duplicates(["Wallet", "Chain", "Token"])
+              .sort_values(["Wallet", "Chain", "Token"], ignore_index=True))
+
+
+# ───────────── Dune rewards ─────────────
+REWARDS_COLS = ["day", "protocol", "rewards_usd"]
+
+
+def rewards_state(query_id, path: str = MIRROR_DB) -> tuple[datetime.datetime | None, float | None]:
+    """(latest stored day, last sync epoch) for a rewards query; Nones when never synced."""
+    with _db(path) as con:
+        day  = con.execute("SELECT MAX(day) FROM rewards WHERE query_id=?", (str(query_id),)).fetchone()[0]
+        sync = con.execute("SELECT synced_at FROM rewards_sync WHERE query_id=?", (str(query_id),)).fetchone()
+    return (datetime.datetime.fromtimestamp(day, datetime.timezone.utc) if day is not None else None,
+            sync[0] if sync else None)
+
+
+def add_rewards(query_id, df: pd.DataFrame, since: datetime.datetime | None = None,
+                path: str = MIRROR_DB) -> int:
+    """
+    Store tidy rewards rows (day UTC, protocol, rewards_usd), summed per
+    (day, protocol).  With ``since`` every day present in ``df`` replaces
+    what is stored for that day, so a still-growing last day is overwritten
+    rather than double counted; with None ``df`` is the full result and
+    replaces all stored rows.  An empty ``df`` deletes nothing – it only
+    marks the query as synced.
+    """
+    qid  = str(query_id)
+    rows = (df.groupby(["day", "protocol"], as_index=False)["rewards_usd"].sum()
+            if not df.empty else pd.DataFrame(columns=REWARDS_COLS))
+    recs = list(zip([qid] * len(rows),
+                    (pd.to_datetime(rows["day"], utc=True).astype("int64") // 10**9).tolist(),
+                    rows["protocol"].astype(str).tolist(),
+                    rows["rewards_usd"].astype(float).tolist()))
+    with _lock, _db(path) as con:
+        if recs and since is None:
+            con.execute("DELETE FROM rewards WHERE query_id=?", (qid,))
+        elif recs:
+            con.executemany("DELETE FROM rewards WHERE query_id=? AND day=?",
+                            [(qid, d) for d in sorted({r[1] for r in recs})])
+        con.executemany("INSERT OR REPLACE INTO rewards VALUES (?,?,?,?)", recs)
+        con.execute("INSERT OR REPLACE INTO rewards_sync VALUES (?,?)", (qid, time.time()))
+    return len(recs)
+
+
+def mark_rewards_synced(query_id, path: str = MIRROR_DB) -> None:
+    """Record a sync attempt without rows, so a failed fetch waits out ``REWARDS_SYNC_EVERY`` too."""
+    with _lock, _db(path) as con:
+        con.execute("INSERT OR REPLACE INTO rewards_sync VALUES (?,?)", (str(query_id), time.time()))
+
+
+def read_rewards(query_id, path: str = MIRROR_DB) -> pd.DataFrame:
+    """Every stored rewards row of a query: day (UTC), protocol, rewards_usd."""
+    with _db(path) as con:
+        df = pd.read_sql_query("SELECT day, protocol, rewards_usd FROM rewards WHERE query_id=? ORDER BY day",
+                               con, params=(str(query_id),))
+    df["day"] = pd.to_datetime(df["day"], unit="s", utc=True)
+    return df[REWARDS_COLS]
+
+
+# ───────────── Debank active chains ─────────────
+def read_active_chains(wallets: list[str], path: str = MIRROR_DB) -> dict[str, tuple[set[str], float]]:
+    """{lower-case wallet: (chain ids, synced_at)} for the ``wallets`` we have an entry for."""
+    keys = list(dict.fromkeys(w.lower() for w in wallets))
+    out  = {}
+    with _db(path) as con:
+        for i in range(0, len(keys), 500):                  # stay under SQLite's variable limit
+            chunk = keys[i:i + 500]
+            for w, chains, at in con.execute(
+                    f"SELECT wallet, chains, synced_at FROM active_chains "
+                    f"WHERE wallet IN ({','.join('?' * len(chunk))})", chunk):
+                out[w] = (set(filter(None, chains.split(","))), at)
+    return out
+
+
+def save_active_chains(chains: dict[str, set[str]], path: str = MIRROR_DB) -> None:
+    """Replace the stored chain list of every wallet in ``chains``."""
+    now = time.time()
+    with _lock, _db(path) as con:
+        con.executemany("INSERT OR REPLACE INTO active_chains VALUES (?,?,?)",
+                        [(w.lower(), ",".join(sorted(c)), now) for w, c in chains.items()])
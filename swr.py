@@ -0,0 +1,100 @@
+"""
+Stale-while-revalidate cache shared by the Debank response cache and the
+Dune price cache.  Instances are meant to live at module level, so they
+outlast Streamlit reruns.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("swr")
+
+
+class SWRCache:
+    """
+    Stale-while-revalidate cache.  ``get(key, fetch)`` returns
+    ``(value, fetched_at)`` (epoch seconds):
+
+      • fresh   age < ttl        → the cached value
+      • stale   age < max_stale  → the cached value at once, while ``fetch``
+                                   re-runs on a background worker (one per
+                                   key) and replaces it if it succeeds
+      • expired / missing        → ``fetch`` runs in the caller's thread
+
+    Background fetches run without a script context, so ``fetch`` must not
+    touch ``st.*``.  Exceptions from a synchronous fetch propagate; with
+    ``error_ttl`` the exception is remembered and re-raised for that many
+    seconds without calling ``fetch`` again, so a failing key doesn't hit
+    the network on every rerun.  With ``max_stale=float("inf")`` the last
+    good value is served for ever and only the very first fetch can block
+    or fail.
+    """
+
+    def __init__(self, ttl: float, max_stale: float, workers: int = 2, name: str = "swr",
+                 error_ttl: float = 0):
+        self.ttl, self.max_stale, self.error_ttl = ttl, max_stale, error_ttl
+        self._data       = {}           # key → (value, fetched_at)
+        self._errors     = {}           # key → (exception, failed_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+    def get(self, key, fetch):
+        with self._lock:
+            hit = self._data.get(key)
+        if hit:
+            age = time.time() - hit[1]
+            if age < self.ttl:
+                return hit
+            if age < self.max_stale:
+                self._revalidate(key, fetch)
+                return hit
+        with self._lock:
+            err = self._errors.get(key)
+        if err and time.time() - err[1] < self.error_ttl:
+            raise err[0]
+        started = time.time()
+        try:
+            value = fetch()
+        except Exception as e:
+            if self.error_ttl:
+                with self._lock:
+                    self._errors[key] = (e, time.time())
+            raise
+        return self._store(key, value, started)
+
+    def stamp(self, key) -> float | None:
+        """When the cached value of ``key`` was fetched (None if not cached)."""
+        hit = self._data.get(key)
+        return hit[1] if hit else None
+
+    def clear(self) -> None:
+        """Forget every cached value (in-flight background refreshes may still land)."""
+        with self._lock:
+            self._data.clear()
+            self._errors.clear()
+
+    def _store(self, key, value, fetched_at: float):
+        with self._lock:
+            self._data[key] = (value, fetched_at)
+            self._errors.pop(key, None)
+        return value, fetched_at
+
+    def _revalidate(self, key, fetch) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def job():
+            started = time.time()
+            try:
+                self._store(key, fetch(), started)
+            except Exception as e:              # keep serving the stale value
+                log.warning("background refresh of %s failed: %s", key, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._pool.submit(job)
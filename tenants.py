@@ -0,0 +1,66 @@
+"""
+Per-tenant configuration for the dashboard engine.
+
+Every page we serve (the DAO treasury and the liquid vaults) is one entry in
+``TENANTS``; ``engine.render(name)`` turns it into a dashboard and
+``collector.py`` uses the same table for its snapshots.
+"""
+
+CHAIN_IDS       = ["eth", "arb", "base", "scrl", "avax", "era", "bsc", "op", "linea", "corn", "zircuit", "bera", "blast", "swell", "uni", "sonic", "hyper"]
+VAULT_CHAIN_IDS = CHAIN_IDS + ["katana", "plasma"]
+CHAIN_NAMES = {"eth":"Ethereum","arb":"Arbitrum","base":"Base","scrl":"Scroll","avax":"Avalanche","era":"zkSync Era","bsc":"BNB Chain","op":"Optimism",
+               "linea":"Linea","corn":"Corn","zircuit":"Zircuit","bera":"Berachain","blast":"Blast","swell":"SwellChain","uni":"Unichain",
+               "sonic":"Sonic","hyper":"Hyperliquid","katana":"Katana","plasma":"Plasma"
+            }
+
+VAULT_COLORS = {
+    "Katana":"#F6FF09","SwellChain":"#2f43ec","Lido":"#4DB0F2","Uniswap V3":"#F50DB4",
+}
+
+
+def _vault(suffix: str, label: str) -> dict:
+    s = f"_{suffix}" if suffix else ""
+    return {
+        "title":           f"{label} Vault Positions",
+        "breakdown":       "Vault Positions Breakdown",
+        "chains":          VAULT_CHAIN_IDS,
+        "addresses":       f"liquid_vaults{s}",
+        "offchain":        f"liquid_vaults_offchain{s}",
+        "history":         f"liquid_vaults_history{s}",
+        "wallet_balances": f"liquid_vaults_wallet_balances{s}",
+        "rewards":         {"title": f"{label} Rewards", "query_secret": "DUNE_REWARDS_QUERY_ID"},
+        "colors":          VAULT_COLORS,
+    }
+
+
+# name → config.  Keys:
+#   title / breakdown     page title and breakdown-section heading
+#   chains                Debank chain ids shown on this page
+#   addresses … wallet_balances   worksheet names in the shared spreadsheet
+#   rewards               None, or the rewards section title + secret holding the Dune query id
+#   colors                overrides on top of engine.COLOR_JSON
+TENANTS = {
+    "dashboard": {
+        "title":           "DeFi Treasury Tracker",
+        "breakdown":       "DAO Treasury Breakdown",
+        "chains":          CHAIN_IDS,
+        "addresses":       "addresses",
+        "offchain":        "offchain",
+        "history":         "history",
+        "wallet_balances": "wallet_balances",
+        "rewards":         None,
+        "colors":          {},
+    },
+    "vault_dashboard":     _vault("",    "liquidETH"),
+    "vault_dashboard_usd": _vault("usd", "liquidUSD"),
+    "vault_dashboard_btc": _vault("btc", "liquidBTC"),
+}
+
+# every chain any tenant shows – wallets are fetched once with this list and
+# each page filters down to its own chains
+ALL_CHAIN_IDS = list(dict.fromkeys(c for t in TENANTS.values() for c in t["chains"]))
+
+
+def chain_names(name: str) -> dict:
+    """{chain_id: display name} for one tenant, in its configured order."""
+    return {c: CHAIN_NAMES[c] for c in TENANTS[name]["chains"]}
@@ -0,0 +1,5 @@
+# the modules under test live at the repo root, next to the dashboards
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
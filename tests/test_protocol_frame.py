@@ -0,0 +1,84 @@
+"""
+protocol_frame against the nested loop it replaced in the original
+dashboard scripts.
+"""
+import copy
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from portfolio import COLS_PROTO, first_symbol, protocol_frame
+from tenants import CHAIN_NAMES
+
+SAMPLE = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "fixtures", "sample.json")
+
+
+# ───────────── reference: the old loop ─────────────
+def old_protocol_frame(wallets, protocol_lists, chain_names):
+    prot_rows = []
+    for w, protocols in zip(wallets, protocol_lists):
+        for p in protocols:
+            for it in p.get("portfolio_item_list", []):
+                desc = (it.get("detail") or {}).get("description") or ""
+                detail = it.get("detail") or {}
+                toks   = (
+                    detail.get("supply_token_list", []) +
+                    detail.get("reward_token_list", []) +
+                    [{**bt, "amount": -bt.get("amount", 0)} for bt in detail.get("borrow_token_list", [])]
+                )
+                for t in toks:
+                    price, amt = t.get("price", 0), t.get("amount", 0)
+                    if price <= 0:
+                        continue
+                    sym = desc if desc and not desc.startswith("#") else first_symbol(t)
+                    prot_rows.append({
+                        "Protocol":       p.get("name"),
+                        "Classification": it.get("name", ""),
+                        "Blockchain":     chain_names.get(p.get("chain"), p.get("chain")),
+                        "Pool":           it.get("pool", {}).get("id", ""),
+                        "Wallet":         w,
+                        "Token":          sym,
+                        "Token Balance":  amt,
+                        "USD Value":      amt * price,
+                    })
+    return pd.DataFrame(prot_rows, columns=COLS_PROTO)
+
+
+# ───────────── protocol_frame ─────────────
+def _token(sym, price, amount):
+    return {"symbol": sym, "optimized_symbol": sym, "price": price, "amount": amount}
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    with open(SAMPLE) as f:
+        debank = json.load(f)["debank"]
+    wallets   = list(debank)
+    protocols = [copy.deepcopy(debank[w]["all_complex_protocol_list"]) for w in wallets]
+    # unpriced tokens next to priced ones, and a position with nothing priced
+    protocols[0].append({
+        "name": "Morpho", "chain": "base", "portfolio_item_list": [
+            {"name": "Lending", "pool": {"id": "0xm1"}, "detail": {
+                "supply_token_list": [_token("USDC", 1.0, 500.0), _token("JUNK", 0, 1e9)],
+                "reward_token_list": [{"symbol": "MORPHO", "amount": 3.0}],       # no price at all
+                "borrow_token_list": [_token("WETH", 2400.0, 0.1)]}},
+            {"name": "Rewards", "pool": {"id": "0xm2"}, "detail": {
+                "reward_token_list": [_token("DUST", 0, 12.0)]}},
+            {"name": "Deposit", "detail": None},
+        ]})
+    return wallets, protocols
+
+
+def test_protocol_frame_matches_old_loop(payloads):
+    wallets, protocols = payloads
+    new = protocol_frame(wallets, protocols, CHAIN_NAMES)
+    old = old_protocol_frame(wallets, protocols, CHAIN_NAMES)
+    assert (new["Token Balance"] < 0).any()                 # borrow rows are covered
+    assert not new["Token"].isin(["JUNK", "MORPHO", "DUST"]).any()
+    pd.testing.assert_frame_equal(new, old, check_dtype=False)
+
+
+def test_protocol_frame_empty():
+    assert list(protocol_frame(["0x0"], [[]], CHAIN_NAMES).columns) == COLS_PROTO
@@ -0,0 +1,30 @@
+"""
+The compiled category matcher against the "first match in sheet order
+wins" keyword loop it replaced.
+"""
+import pytest
+
+from portfolio import category_matcher
+
+
+# ───────────── reference: the old loop ─────────────
+def old_token_category(tok, cats):
+    symbol = tok.lower()
+    for kw, cat in cats.items():          # first match wins
+        if kw in symbol:
+            return cat
+    return "Others"
+
+
+# ───────────── category matcher ─────────────
+@pytest.mark.parametrize("cats", [
+    {"eth": "ETH", "weeth": "LRT", "usd": "Stables"},       # earliest-listed keyword starts later
+    {"weeth": "LRT", "eth": "ETH", "usd": "Stables"},
+    {"usd": "Stables", "usde": "Ethena", "btc": "BTC", "wbtc": "Wrapped"},
+    {"sd": "X", "usdc": "Stables", "c": "C"},
+    {},
+])
+def test_category_matcher_matches_old_loop(cats):
+    symbols = ["weETH", "ETH", "stETH", "USDe", "sUSDe", "USDC", "wBTC", "cbBTC", "GHO", "ETHFI", "weethusd", ""]
+    match = category_matcher(cats)
+    assert [match(s) for s in symbols] == [old_token_category(s, cats) for s in symbols]
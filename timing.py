@@ -0,0 +1,127 @@
+"""
+Per-run stage timings for the dashboards.
+
+``engine.render`` opens a ``Run`` for every script run and marks the end of
+each page section with ``lap()``; helpers that do I/O are wrapped with
+``@timed`` so every call is counted and timed, including calls made from
+the Debank worker threads.  A cached helper calls ``miss()`` from its body
+(which only executes on a cache miss), so hits are calls minus misses.
+
+At the end of a run ``finish()`` logs one JSON line and returns the stats
+shown in the optional sidebar panel.
+"""
+import functools
+import json
+import logging
+import threading
+import time
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+log = logging.getLogger("treasury.timing")
+if not log.handlers:                    # Streamlit only configures its own loggers
+    _h = logging.StreamHandler()
+    _h.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    log.addHandler(_h)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+_lock = threading.Lock()
+_runs = {}              # session id (None outside Streamlit) → Run
+
+
+def _session():
+    # also called from SWR background refreshes, which have no script context
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+class Run:
+    """Wall time, call count and cache misses per stage of one script run."""
+
+    def __init__(self, page: str):
+        self.page    = page
+        self.started = self.mark = time.perf_counter()
+        self.stages  = {}           # name → {"calls", "seconds", "misses", "cached"}
+
+    def add(self, stage: str, seconds: float = 0.0, calls: int = 1, misses: int = 0,
+            cached: bool = False) -> None:
+        with _lock:
+            s = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "misses": 0, "cached": False})
+            s["calls"]   += calls
+            s["seconds"] += seconds
+            s["misses"]  += misses
+            s["cached"]  |= cached
+
+    def lap(self, stage: str) -> None:
+        """Charge the time since the previous lap (or the start) to ``stage``."""
+        now = time.perf_counter()
+        self.add(stage, now - self.mark)
+        self.mark = now
+
+    def summary(self) -> dict:
+        with _lock:
+            stages = {k: {"calls":   v["calls"],
+                          "hits":    v["calls"] - v["misses"] if v["cached"] else None,
+                          "misses":  v["misses"] if v["cached"] else None,
+                          "seconds": round(v["seconds"], 4)}
+                      for k, v in self.stages.items()}
+        return {"page": self.page,
+                "total_s": round(time.perf_counter() - self.started, 4),
+                "stages": stages}
+
+
+def start(page: str) -> Run:
+    """Begin timing a new run of ``page`` for the current session."""
+    run = Run(page)
+    with _lock:
+        _runs[_session()] = run
+    return run
+
+
+def current() -> Run | None:
+    return _runs.get(_session())
+
+
+def lap(stage: str) -> None:
+    run = current()
+    if run:
+        run.lap(stage)
+
+
+def miss(stage: str) -> None:
+    """Record a cache miss for ``stage``; call it from inside the cached body."""
+    run = current()
+    if run:
+        run.add(stage, calls=0, misses=1, cached=True)
+
+
+def timed(stage: str, cached: bool = False):
+    """
+    Decorator: count and time every call of the wrapped function as
+    ``stage``.  ``cached`` marks a cached function whose body calls
+    ``miss()``, so the stage reports hits and misses.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                run = current()
+                if run:
+                    run.add(stage, time.perf_counter() - t0, cached=cached)
+        return inner
+    return wrap
+
+
+def finish() -> dict:
+    """Close the current run: log it as one JSON line and return its summary."""
+    with _lock:
+        run = _runs.pop(_session(), None)
+    if run is None:
+        return {}
+    summary = run.summary()
+    log.info(json.dumps(summary))
+    return summary